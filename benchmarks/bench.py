@@ -0,0 +1,207 @@
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from hashsoup import *
+from hashsoup.discovery import EXTENDABLE
+
+# Run from the repo root: `python benchmarks/bench.py --json out.json`, then
+# `python benchmarks/bench.py --compare out.json` to flag regressions.
+# Inputs stop at --max-size (1 MB by default, 67108864 for the full range).
+# Metric names starting with "MB/s" are better when higher, the rest when lower.
+
+ALGORITHMS = {
+    "MD2": MD2,
+    "MD4": MD4,
+    "MD5": MD5,
+    "SHA1": SHA1,
+    "SHA224": SHA224,
+    "SHA256": SHA256,
+    "SHA384": SHA384,
+    "SHA512": SHA512,
+    "RIPEMD128": RIPEMD128,
+    "RIPEMD160": RIPEMD160,
+    "SHA3_224": SHA3_224,
+    "SHA3_256": SHA3_256,
+    "SHA3_384": SHA3_384,
+    "SHA3_512": SHA3_512,
+    "SHAKE_128": lambda inp=None: SHAKE_128(256, inp),
+    "SHAKE_256": lambda inp=None: SHAKE_256(512, inp),
+}
+
+HASHLIB = {
+    "MD4": "md4",
+    "MD5": "md5",
+    "SHA1": "sha1",
+    "SHA224": "sha224",
+    "SHA256": "sha256",
+    "SHA384": "sha384",
+    "SHA512": "sha512",
+    "RIPEMD160": "ripemd160",
+    "SHA3_224": "sha3_224",
+    "SHA3_256": "sha3_256",
+    "SHA3_384": "sha3_384",
+    "SHA3_512": "sha3_512",
+    "SHAKE_128": "shake_128",
+    "SHAKE_256": "shake_256",
+}
+
+# Powers of 16 from 16 B to 16 MB, then 64 MB
+SIZES = [16**i for i in range(1, 7)] + [64 << 20]
+
+
+def timeit(fn, min_time: float) -> float:
+    # Seconds per call, repeating until the batch takes `min_time`
+    n = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / n
+        n = n * 2 if elapsed * 4 < min_time else int(n * min_time / elapsed) + 1
+
+
+def hashlib_new(name: str):
+    try:
+        return hashlib.new(HASHLIB[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def hashlib_digest(reference, data: bytes) -> bytes:
+    hasher = reference.copy()
+    hasher.update(data)
+    return hasher.digest(32) if hasher.name.startswith("shake") else hasher.digest()
+
+
+def bench_algorithm(name: str, algorithm, sizes: list[int], min_time: float):
+    metrics = {}
+    baseline = {}
+    block = algorithm().LEN_BLOCK
+
+    for size in sizes:
+        data = bytes(size)
+        seconds = timeit(lambda: algorithm(data).digest(), min_time)
+        metrics[f"MB/s {size}"] = size / seconds / 1e6
+
+        reference = hashlib_new(name)
+        if reference is not None:
+            seconds = timeit(lambda: hashlib_digest(reference, data), min_time)
+            baseline[f"MB/s {size}"] = size / seconds / 1e6
+
+    # The raw compression function, without buffering or padding
+    hasher = algorithm()
+    update_chunk = hasher._chunk_updater()
+    chunk = bytes(block)
+    metrics["ns/compression"] = timeit(lambda: update_chunk(chunk), min_time) * 1e9
+
+    metrics["ns/construction"] = timeit(algorithm, min_time) * 1e9
+
+    hasher = algorithm(bytes(block * 3 + 5))
+
+    def digest():
+        hasher.update(b"")
+        hasher.digest()
+
+    metrics["ns/digest"] = timeit(digest, min_time) * 1e9
+
+    # Peak allocations while hashing up to 1 MB, the input itself excluded
+    # (tracing every allocation is slow, so this runs once)
+    data = bytes(min(sizes[-1], 1 << 20))
+    tracemalloc.start()
+    algorithm(data).digest()
+    metrics["peak bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return metrics, baseline
+
+
+def bench_extension(algorithm, min_time: float) -> float:
+    # Forging 64 candidate secret lengths from a known digest
+    message, suffix = b"user=guest", b";admin=true" * 10
+    known = algorithm(b"secret" + message).digest()
+    run = lambda: extend(algorithm, known, message, suffix, range(1, 65))
+    return timeit(run, min_time) * 1e3
+
+
+def run(names: list[str], max_size: int, min_time: float) -> dict:
+    sizes = [size for size in SIZES if size <= max_size]
+    results = {}
+    for name in names:
+        algorithm = ALGORITHMS[name]
+        metrics, baseline = bench_algorithm(name, algorithm, sizes, min_time)
+        if any(name in names for names in EXTENDABLE.values()):
+            metrics["ms/extension"] = bench_extension(algorithm, min_time)
+        results[name] = {"metrics": metrics, "hashlib": baseline}
+        print(f"{name}: {json.dumps(metrics)}", file=sys.stderr)
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "backend": get_backend(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        for metric, value in result["metrics"].items():
+            before = old["metrics"].get(metric)
+            if not before or not value:
+                continue
+            if metric.startswith("MB/s"):
+                change = before / value - 1
+            else:
+                change = value / before - 1
+            line = f"{name:10} {metric:16} {before:14.2f} -> {value:14.2f}"
+            if change > threshold:
+                regressions.append(f"{line}  {change:+.0%} slower")
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hashsoup.")
+    parser.add_argument("-a", "--algorithms", nargs="+", choices=list(ALGORITHMS))
+    parser.add_argument("--max-size", type=int, default=1 << 20)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--compare", help="baseline JSON to check against")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--backend", default="python", help="python, hashlib or auto")
+    args = parser.parse_args(argv)
+    set_backend(args.backend)
+
+    results = run(args.algorithms or list(ALGORITHMS), args.max_size, args.min_time)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Run from the repo root: `python benchmarks/import_time.py`. Each statement
+# runs in a fresh interpreter and the time of a bare one is subtracted, so
+# the numbers are what a CLI run or a pool worker pays at start-up.
+# `from hashsoup import *` loads everything, as `import hashsoup` used to.
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+STATEMENTS = [
+    "import hashsoup",
+    "from hashsoup import MD5",
+    "from hashsoup import SHA3_256",
+    "import hashsoup; hashsoup.new('sha256')",
+    "from hashsoup import *",
+]
+
+
+def run(statement: str, repeat: int) -> float:
+    env = dict(os.environ, PYTHONPATH=SRC)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", statement], env=env, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark importing hashsoup.")
+    parser.add_argument("-n", "--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    # Compiles the bytecode caches first
+    run("from hashsoup import *", 1)
+    bare = run("pass", args.repeat)
+    print(f"{'interpreter start-up':<44}{bare * 1e3:8.1f} ms")
+    for statement in STATEMENTS:
+        elapsed = run(statement, args.repeat) - bare
+        print(f"{statement:<44}{elapsed * 1e3:8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,40 @@
-from .md2 import MD2
-from .md4 import MD4
-from .md5 import MD5
+from importlib import import_module
 
-from .sha1 import SHA1
-from .sha224 import SHA224
-from .sha256 import SHA256
-from .sha384 import SHA384
-from .sha512 import SHA512
+from .registry import ALGORITHMS, algorithms_available, new
 
-from .ripemd128 import RIPEMD128
-from .ripemd160 import RIPEMD160
+# Name -> submodule defining it. Nothing is imported until first use, so a
+# process needing only MD5 does not pay for every other algorithm.
+_EXPORTS = {
+    **ALGORITHMS,
+    "get_backend": "hasher",
+    "set_backend": "hasher",
+    "extend": "extension",
+    "HMAC": "mac",
+    "pbkdf2_hmac": "kdf",
+    "MerkleTree": "merkle",
+    "MultiHasher": "multi",
+    "hash_file": "files",
+    "hash_files": "files",
+    "discover": "discovery",
+}
 
-from .keccak import SHA3_224, SHA3_256, SHA3_384, SHA3_512
-from .keccak import SHAKE_128, SHAKE_256
+__all__ = [*_EXPORTS, "algorithms_available", "new"]
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(import_module(f".{_EXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    # Submodules were reachable as attributes when everything was imported
+    if not name.startswith("_"):
+        try:
+            return import_module(f".{name}", __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f"{__name__}.{name}":
+                raise
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted({*globals(), *__all__})
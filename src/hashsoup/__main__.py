@@ -0,0 +1,181 @@
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+from . import registry
+
+# Works like sha256sum and friends: `python -m hashsoup -a md5 FILE...`
+
+
+def _parser() -> argparse.ArgumentParser:
+    names = [name.lower() for name in registry.ALGORITHMS]
+    parser = argparse.ArgumentParser(
+        prog="python -m hashsoup", description="Print or check hashsoup checksums."
+    )
+    parser.add_argument("files", nargs="*", help="files to hash, - for stdin")
+    parser.add_argument("-a", "--algorithm", default="sha256", choices=names)
+    parser.add_argument(
+        "-l", "--length", type=int, help="output length in bytes, for shake_*"
+    )
+    parser.add_argument("-c", "--check", action="store_true", help="verify manifests")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes")
+    parser.add_argument("--quiet", action="store_true", help="do not print OK")
+    parser.add_argument("--status", action="store_true", help="only set exit code")
+
+    extension = parser.add_argument_group("length extension")
+    extension.add_argument("--state", help="continue from this hex state")
+    extension.add_argument(
+        "--digested", type=int, help="bytes behind --state, including padding"
+    )
+    extension.add_argument("--append", help="hash this text instead of files")
+    return parser
+
+
+def _hasher(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    algorithm = registry.get(args.algorithm.upper())
+    kwargs = {}
+    if args.state is not None:
+        if args.digested is None:
+            parser.error("--state needs --digested")
+        kwargs["state"] = bytes.fromhex(args.state)
+        kwargs["digested"] = args.digested
+    if args.algorithm.startswith("shake"):
+        if not args.length:
+            parser.error(f"{args.algorithm} needs --length")
+        return algorithm(args.length * 8, **kwargs)
+    return algorithm(**kwargs)
+
+
+def _hash_all(paths: list[str], hasher, jobs: int):
+    # Yields (path, digest or error) in the order of `paths`
+    from .files import hash_file, hash_files
+
+    if jobs <= 1 or len(paths) <= 1 or "-" in paths:
+        for path in paths:
+            try:
+                file = sys.stdin.buffer if path == "-" else path
+                yield path, hash_file(file, hasher).digest()
+            except OSError as e:
+                yield path, e
+        return
+
+    # Results come back as they complete, and are released in order
+    done, next_ = {}, 0
+    for result in hash_files(paths, [hasher], workers=jobs):
+        done[result.path] = result.error or result.digests[0]
+        while next_ < len(paths) and paths[next_] in done:
+            yield paths[next_], done.pop(paths[next_])
+            next_ += 1
+
+
+def _print(args, hasher, paths: list[str]) -> int:
+    status = 0
+    for path, result in _hash_all(paths, hasher, args.jobs):
+        if isinstance(result, Exception):
+            print(f"hashsoup: {path}: {result}", file=sys.stderr)
+            status = 1
+        else:
+            print(f"{result.hex()}  {path}")
+    return status
+
+
+def _manifest(path: str, len_digest: int):
+    # Yields (digest, path), or None for an improperly formatted line
+    f = sys.stdin if path == "-" else open(path)
+    with f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            expected, _, name = line.partition(" ")
+            name = name[1:] if name[:1] in " *" else name
+            try:
+                digest = bytes.fromhex(expected)
+            except ValueError:
+                digest = None
+            if digest is None or len(digest) != len_digest or not name:
+                yield None
+            else:
+                yield digest, name
+
+
+def _check(args, hasher, manifests: list[str]) -> int:
+    # A path listed more than once is hashed once and checked every time
+    len_digest = len(hasher.digest())
+    entries, improper = [], 0
+    for manifest in manifests:
+        for entry in _manifest(manifest, len_digest):
+            if entry is None:
+                improper += 1
+            else:
+                entries.append(entry)
+
+    failed = unreadable = size = 0
+    start = time.perf_counter()
+    paths = list(dict.fromkeys(path for _, path in entries))
+    results, i = {}, 0
+    for path, result in _hash_all(paths, hasher, args.jobs):
+        results[path] = result
+        while i < len(entries) and entries[i][1] in results:
+            expected, path = entries[i]
+            result = results[path]
+            i += 1
+            if isinstance(result, Exception):
+                unreadable += 1
+                if not args.status:
+                    print(f"hashsoup: {path}: {result}", file=sys.stderr)
+                    print(f"{path}: FAILED open or read")
+                continue
+
+            size += os.path.getsize(path)
+            if result != expected:
+                failed += 1
+                if not args.status:
+                    print(f"{path}: FAILED")
+            elif not (args.quiet or args.status):
+                print(f"{path}: OK")
+    elapsed = time.perf_counter() - start
+
+    if not args.status:
+        if improper:
+            lines = "1 line is" if improper == 1 else f"{improper} lines are"
+            print(f"hashsoup: WARNING: {lines} improperly formatted", file=sys.stderr)
+        if unreadable:
+            print(
+                f"hashsoup: WARNING: {unreadable} listed files could not be read",
+                file=sys.stderr,
+            )
+        if failed:
+            print(
+                f"hashsoup: WARNING: {failed} computed checksums did NOT match",
+                file=sys.stderr,
+            )
+        mb = size / 1e6
+        rate = mb / elapsed if elapsed else 0.0
+        print(
+            f"hashsoup: {len(entries)} files, {mb:.1f} MB in {elapsed:.2f}s"
+            f" ({rate:.1f} MB/s)",
+            file=sys.stderr,
+        )
+    return 1 if failed or unreadable or not entries else 0
+
+
+def main(argv: list[str] = None) -> int:
+    parser = _parser()
+    args = parser.parse_args(argv)
+    hasher = _hasher(parser, args)
+    paths = args.files or ["-"]
+
+    if args.check:
+        return _check(args, hasher, paths)
+    if args.append is not None:
+        hasher.update(args.append.encode())
+        print(hasher.hexdigest())
+        return 0
+    return _print(args, hasher, paths)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
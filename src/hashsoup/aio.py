@@ -0,0 +1,102 @@
+from __future__ import annotations
+import asyncio
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Union
+
+from .hasher import Hasher
+from .multi import _absorb
+
+# Chunks passed to update_async() are gathered into batches of this many bytes
+# before one executor call absorbs them. Each hasher has at most one batch in
+# flight, so its chunks stay in order, and at most MAX_IN_FLIGHT batches run
+# per event loop; callers wait while their hasher's batch is full.
+BATCH_SIZE = 1 << 20
+MAX_IN_FLIGHT = 8
+READ_SIZE = 1 << 16
+
+
+class _Feeder:
+    def __init__(self):
+        self.pending = bytearray()
+        self.lock = asyncio.Lock()
+
+
+_feeders: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _feeder(hasher: Hasher) -> _Feeder:
+    feeder = _feeders.get(hasher)
+    if feeder is None:
+        feeder = _feeders[hasher] = _Feeder()
+    return feeder
+
+
+def _semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _slots.get(loop)
+    if semaphore is None:
+        semaphore = _slots[loop] = asyncio.Semaphore(MAX_IN_FLIGHT)
+    return semaphore
+
+
+async def _absorb_batch(hasher: Hasher, data: bytes, executor: Executor) -> None:
+    loop = asyncio.get_running_loop()
+
+    # hashlib and libcrypto release the GIL, so only pure-Python engines are
+    # worth sending to another process
+    remote = isinstance(executor, ProcessPoolExecutor)
+    if not remote or not hasher._compresses_in_python():
+        await loop.run_in_executor(None if remote else executor, hasher.update, data)
+        return
+
+    backend = hasher.backend
+    other = await loop.run_in_executor(executor, _absorb, hasher, data)
+    hasher.__dict__.update(other.__dict__)
+    hasher.backend = backend
+
+
+async def flush(hasher: Hasher, executor: Executor = None) -> None:
+    feeder = _feeder(hasher)
+    async with feeder.lock:
+        if not feeder.pending:
+            return
+        data, feeder.pending = feeder.pending, bytearray()
+        async with _semaphore():
+            await _absorb_batch(hasher, data, executor)
+
+
+async def update(
+    hasher: Hasher,
+    inp: bytes,
+    executor: Executor = None,
+    batch_size: int = None,
+) -> None:
+    # The data is only absorbed once flush() or a later full batch runs
+    feeder = _feeder(hasher)
+    feeder.pending += inp
+    if len(feeder.pending) >= (batch_size or BATCH_SIZE):
+        await flush(hasher, executor)
+
+
+async def digest(hasher: Hasher, executor: Executor = None) -> bytes:
+    await flush(hasher, executor)
+    return hasher.digest()
+
+
+async def hash_stream(
+    reader,
+    algorithm: Union[type[Hasher], Hasher],
+    executor: Executor = None,
+    batch_size: int = None,
+) -> Hasher:
+    # `reader` is an asyncio.StreamReader or anything with `await read(n)`
+    hasher = algorithm.copy() if isinstance(algorithm, Hasher) else algorithm()
+    while True:
+        chunk = await reader.read(READ_SIZE)
+        if not chunk:
+            break
+        await update(hasher, chunk, executor, batch_size)
+    await flush(hasher, executor)
+    return hasher
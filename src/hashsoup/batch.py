@@ -0,0 +1,388 @@
+from __future__ import annotations
+from typing import Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from .hasher import Hasher
+from .md4 import MD4
+from .md5 import MD5
+from .sha1 import SHA1
+from .sha224 import SHA224
+from .sha256 import SHA256
+from .sha384 import SHA384
+from .sha512 import SHA512
+from .ripemd128 import RIPEMD128
+from .ripemd160 import RIPEMD160
+from .keccak import Keccak
+
+# Vectorized versions of each `_update_chunk`. `H` is the list of state words
+# and `M` the list of message words, each a uint32 (or uint64) array with one
+# entry per lane.
+# numpy arithmetic wraps around, so no masking is needed.
+
+
+def _rol32(v, a: int):
+    a %= 32
+    if a == 0:
+        return v
+    return (v << a) | (v >> (32 - a))
+
+
+def _ror32(v, a: int):
+    return _rol32(v, 32 - a)
+
+
+def _ror64(v, a: int):
+    a %= 64
+    if a == 0:
+        return v
+    return (v >> a) | (v << (64 - a))
+
+
+def _rol64(v, a):
+    # `a` may also be an array of rotation amounts
+    return (v << a) | (v >> ((64 - a) % 64))
+
+
+def _md4(h: MD4, H: list, M: list) -> list:
+    A, B, C, D = H
+    for i in range(48):
+        if i < 16:
+            F = D ^ (B & (C ^ D))
+            K = h.C[0]
+        elif i < 32:
+            F = (B & C) | (C & D) | (B & D)
+            K = h.C[1]
+        else:
+            F = B ^ C ^ D
+            K = h.C[2]
+        A = _rol32(F + A + np.uint32(K) + M[h.g[i]], h.s[i])
+        A, D, C, B = D, C, B, A
+
+    return [H[0] + A, H[1] + B, H[2] + C, H[3] + D]
+
+
+def _md5(h: MD5, H: list, M: list) -> list:
+    A, B, C, D = H
+    for i in range(64):
+        if i < 16:
+            F = D ^ (B & (C ^ D))
+            g = i
+        elif i < 32:
+            F = C ^ (D & (B ^ C))
+            g = (5 * i + 1) % 16
+        elif i < 48:
+            F = B ^ C ^ D
+            g = (3 * i + 5) % 16
+        else:
+            F = C ^ (B | ~D)
+            g = 7 * i % 16
+        F = F + A + np.uint32(h.K[i]) + M[g]
+        A, D, C = D, C, B
+        B = B + _rol32(F, h.s[i])
+
+    return [H[0] + A, H[1] + B, H[2] + C, H[3] + D]
+
+
+def _sha1(h: SHA1, H: list, M: list) -> list:
+    w = list(M)
+    a, b, c, d, e = H
+
+    for i in range(16, 80):
+        w.append(_rol32(w[i - 3] ^ w[i - 8] ^ w[i - 14] ^ w[i - 16], 1))
+
+    for i in range(80):
+        if i < 20:
+            f = (b & c) ^ (~b & d)
+        elif i < 40:
+            f = b ^ c ^ d
+        elif i < 60:
+            f = (b & c) ^ (b & d) ^ (c & d)
+        else:
+            f = b ^ c ^ d
+
+        temp = _rol32(a, 5) + f + e + np.uint32(h.K[i // 20]) + w[i]
+        e, d, c, b, a = d, c, _rol32(b, 30), a, temp
+
+    return [H[0] + a, H[1] + b, H[2] + c, H[3] + d, H[4] + e]
+
+
+def _sha256(h: Union[SHA224, SHA256], H: list, M: list) -> list:
+    w = list(M)
+    a, b, c, d, e, f, g, hh = H
+
+    for i in range(16, 64):
+        s0 = _ror32(w[i - 15], 7) ^ _ror32(w[i - 15], 18) ^ (w[i - 15] >> 3)
+        s1 = _ror32(w[i - 2], 17) ^ _ror32(w[i - 2], 19) ^ (w[i - 2] >> 10)
+        w.append(w[i - 16] + s0 + w[i - 7] + s1)
+
+    for i in range(64):
+        S1 = _ror32(e, 6) ^ _ror32(e, 11) ^ _ror32(e, 25)
+        ch = (e & f) ^ (~e & g)
+        temp1 = hh + S1 + ch + np.uint32(h.k[i]) + w[i]
+        S0 = _ror32(a, 2) ^ _ror32(a, 13) ^ _ror32(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        temp2 = S0 + maj
+
+        hh, g, f, e, d, c, b, a = g, f, e, d + temp1, c, b, a, temp1 + temp2
+
+    return [x + y for x, y in zip(H, [a, b, c, d, e, f, g, hh])]
+
+
+def _sha512(h: Union[SHA384, SHA512], H: list, M: list) -> list:
+    w = list(M)
+    a, b, c, d, e, f, g, hh = H
+
+    for i in range(16, 80):
+        s0 = _ror64(w[i - 15], 1) ^ _ror64(w[i - 15], 8) ^ (w[i - 15] >> 7)
+        s1 = _ror64(w[i - 2], 19) ^ _ror64(w[i - 2], 61) ^ (w[i - 2] >> 6)
+        w.append(w[i - 16] + s0 + w[i - 7] + s1)
+
+    for i in range(80):
+        S1 = _ror64(e, 14) ^ _ror64(e, 18) ^ _ror64(e, 41)
+        ch = (e & f) ^ (~e & g)
+        temp1 = hh + S1 + ch + np.uint64(h.k[i]) + w[i]
+        S0 = _ror64(a, 28) ^ _ror64(a, 34) ^ _ror64(a, 39)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        temp2 = S0 + maj
+
+        hh, g, f, e, d, c, b, a = g, f, e, d + temp1, c, b, a, temp1 + temp2
+
+    return [x + y for x, y in zip(H, [a, b, c, d, e, f, g, hh])]
+
+
+def _ripemd128(h: RIPEMD128, H: list, M: list) -> list:
+    # Round 1-4
+    A, B, C, D = H
+    for i in range(64):
+        if i < 16:
+            F = B ^ C ^ D
+        elif i < 32:
+            F = (B & C) | (~B & D)
+        elif i < 48:
+            F = (B | ~C) ^ D
+        else:
+            F = (B & D) | (C & ~D)
+
+        A = _rol32(F + A + M[h.g1[i]] + np.uint32(h.C1[i // 16]), h.s1[i])
+        A, D, C, B = D, C, B, A
+
+    # Parallel round 1-4
+    AA, BB, CC, DD = H
+    for i in range(64):
+        if i < 16:
+            F = (BB & DD) | (CC & ~DD)
+        elif i < 32:
+            F = (BB | ~CC) ^ DD
+        elif i < 48:
+            F = (BB & CC) | (~BB & DD)
+        else:
+            F = BB ^ CC ^ DD
+
+        AA = _rol32(F + AA + M[h.g2[i]] + np.uint32(h.C2[i // 16]), h.s2[i])
+        AA, DD, CC, BB = DD, CC, BB, AA
+
+    return [H[1] + C + DD, H[2] + D + AA, H[3] + A + BB, H[0] + B + CC]
+
+
+def _ripemd160(h: RIPEMD160, H: list, M: list) -> list:
+    # Round 1-5
+    A, B, C, D, E = H
+    for i in range(80):
+        if i < 16:
+            F = B ^ C ^ D
+        elif i < 32:
+            F = (B & C) | (~B & D)
+        elif i < 48:
+            F = (B | ~C) ^ D
+        elif i < 64:
+            F = (B & D) | (C & ~D)
+        else:
+            F = B ^ (C | ~D)
+
+        A = F + A + M[h.g1[i]] + np.uint32(h.C1[i // 16])
+        A = _rol32(A, h.s1[i]) + E
+        C = _rol32(C, 10)
+        A, E, D, C, B = E, D, C, B, A
+
+    # Parallel round 1-5
+    AA, BB, CC, DD, EE = H
+    for i in range(80):
+        if i < 16:
+            F = BB ^ (CC | ~DD)
+        elif i < 32:
+            F = (BB & DD) | (CC & ~DD)
+        elif i < 48:
+            F = (BB | ~CC) ^ DD
+        elif i < 64:
+            F = (BB & CC) | (~BB & DD)
+        else:
+            F = BB ^ CC ^ DD
+
+        AA = F + AA + M[h.g2[i]] + np.uint32(h.C2[i // 16])
+        AA = _rol32(AA, h.s2[i]) + EE
+        CC = _rol32(CC, 10)
+        AA, EE, DD, CC, BB = EE, DD, CC, BB, AA
+
+    return [
+        H[1] + C + DD,
+        H[2] + D + EE,
+        H[3] + E + AA,
+        H[4] + A + BB,
+        H[0] + B + CC,
+    ]
+
+
+# Algorithm -> (word dtype, compression function)
+ENGINES = {
+    MD4: ("<u4", _md4),
+    MD5: ("<u4", _md5),
+    SHA1: (">u4", _sha1),
+    SHA224: (">u4", _sha256),
+    SHA256: (">u4", _sha256),
+    SHA384: (">u8", _sha512),
+    SHA512: (">u8", _sha512),
+    RIPEMD128: ("<u4", _ripemd128),
+    RIPEMD160: ("<u4", _ripemd160),
+}
+
+
+def _find_engine(hasher: Hasher):
+    for cls in type(hasher).__mro__:
+        if cls in ENGINES:
+            return ENGINES[cls]
+    raise TypeError(f"{type(hasher).__name__} has no batch engine")
+
+
+def _keccak_f(h: Keccak, A) -> None:
+    # In place on a (lanes, 25) uint64 array, where word x + 5 * y is A[x][y]
+    rho = np.array([h.r[j % 5][j // 5] % 64 for j in range(25)], dtype=np.uint64)
+    pi = [0] * 25
+    for x in range(5):
+        for y in range(5):
+            pi[y + 5 * ((2 * x + 3 * y) % 5)] = x + 5 * y
+
+    for i in range(h.nr):
+        # Theta step
+        C = np.bitwise_xor.reduce(A.reshape(-1, 5, 5), axis=1)
+        D = np.roll(C, 1, axis=1) ^ _rol64(np.roll(C, -1, axis=1), 1)
+        A ^= np.tile(D, 5)
+
+        # Rho & phi step
+        B = _rol64(A, rho)[:, pi].reshape(-1, 5, 5)
+
+        # Chi step
+        B ^= ~np.roll(B, -1, axis=2) & np.roll(B, -2, axis=2)
+        A[:] = B.reshape(-1, 25)
+
+        # Iota step
+        A[:, 0] ^= np.uint64(h.RC[i])
+
+
+def _buckets(hasher: Hasher, messages: Sequence[bytes], digested: Sequence[int]):
+    # Pad every lane and bucket them by the number of blocks
+    buckets = {}
+    for i, message in enumerate(messages):
+        len_ = hasher.digested if digested is None else digested[i]
+        padded = bytes(message) + hasher.get_padding(len_ + len(message))
+        buckets.setdefault(len(padded) // hasher.LEN_BLOCK, []).append((i, padded))
+
+    for num_blocks, lanes in buckets.items():
+        index = np.array([i for i, _ in lanes], dtype=np.intp)
+        yield num_blocks, index, b"".join(padded for _, padded in lanes)
+
+
+def _compress_many(
+    hasher: Hasher,
+    messages: Sequence[bytes],
+    states: Sequence[bytes],
+    digested: Sequence[int],
+):
+    dtype, compress = _find_engine(hasher)
+    dtype = np.dtype(dtype)
+    words = hasher.LEN_BLOCK // dtype.itemsize
+    len_digest = len(hasher._output())
+
+    out = np.empty((len(messages), len_digest), dtype=np.uint8)
+    for num_blocks, index, padded in _buckets(hasher, messages, digested):
+        data = np.frombuffer(padded, dtype=dtype)
+        # (block, word, lane), so each message word is a contiguous lane vector
+        data = data.reshape(len(index), num_blocks, words).transpose(1, 2, 0)
+        data = np.ascontiguousarray(data, dtype=dtype.newbyteorder("="))
+
+        init = np.empty((len(index), len(hasher.state)), dtype=data.dtype)
+        init[:] = hasher.state
+        if states is not None:
+            for j, i in enumerate(index):
+                if states[i] is not None:
+                    assert (
+                        len(states[i]) == hasher.LEN_STATE
+                    ), f"The state must be {hasher.LEN_STATE}-byte"
+                    init[j] = np.frombuffer(states[i], dtype=dtype)
+
+        H = list(np.ascontiguousarray(init.T))
+        for block in data:
+            H = compress(hasher, H, block)
+
+        digests = np.stack(H, axis=1).astype(dtype).view(np.uint8)
+        out[index] = digests[:, :len_digest]
+
+    return out
+
+
+def _sponge_many(hasher: Keccak, messages: Sequence[bytes], digested: Sequence[int]):
+    assert hasher.w == 64, "Only Keccak-f[1600] has a batch engine"
+    assert hasher.d is not None, "The output length must be given"
+    words = hasher.num_words
+    len_digest = hasher.d >> 3
+    init = [hasher.state[j % 5][j // 5] for j in range(25)]
+
+    out = np.empty((len(messages), len_digest), dtype=np.uint8)
+    for num_blocks, index, padded in _buckets(hasher, messages, digested):
+        data = np.frombuffer(padded, dtype="<u8")
+        data = data.reshape(len(index), num_blocks, words)
+
+        # Absorbing phase
+        A = np.empty((len(index), 25), dtype=np.uint64)
+        A[:] = init
+        for i in range(num_blocks):
+            A[:, :words] ^= data[:, i]
+            _keccak_f(hasher, A)
+
+        # Squeezing phase
+        Z = [A[:, :words].astype("<u8").view(np.uint8)]
+        while len(Z) * hasher.LEN_BLOCK < len_digest:
+            _keccak_f(hasher, A)
+            Z.append(A[:, :words].astype("<u8").view(np.uint8))
+        out[index] = np.concatenate(Z, axis=1)[:, :len_digest]
+
+    return out
+
+
+def hash_many(
+    algorithm: Union[type[Hasher], Hasher],
+    messages: Sequence[bytes],
+    states: Sequence[bytes] = None,
+    digested: Sequence[int] = None,
+):
+    # Same as `[algorithm.copy().update(m).digest() for m in messages]`, with
+    # every message hashed in lockstep. `algorithm` may be a class or a fresh
+    # instance (with custom constants or state, or a SHAKE with its output
+    # length), `states` and `digested` override the initial state and byte
+    # length for each lane. Returns an (N, digest size) uint8 array.
+    if np is None:
+        raise ImportError("hash_many() requires numpy")
+
+    hasher = algorithm if isinstance(algorithm, Hasher) else algorithm()
+    assert len(hasher.buffer) == 0, "The hasher must not have buffered input"
+    n = len(messages)
+    assert states is None or len(states) == n, "One state per message"
+    assert digested is None or len(digested) == n, "One digested per message"
+
+    if isinstance(hasher, Keccak):
+        assert states is None, "Keccak does not take a state"
+        return _sponge_many(hasher, messages, digested)
+    return _compress_many(hasher, messages, states, digested)
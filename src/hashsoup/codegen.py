@@ -0,0 +1,161 @@
+from __future__ import annotations
+import marshal
+import os
+import sys
+from collections.abc import Callable
+from struct import Struct
+from types import CodeType
+
+# Compiles the straight-line `compress(H, M)` functions emitted by each hasher's
+# `_source()` from its actual constant tables. Compiled code is cached by a hash
+# of the constant set, in memory and on disk under $HASHSOUP_CACHE_DIR
+# (default ~/.cache/hashsoup, empty to disable).
+
+# Bump when the helpers below change the emitted code
+VERSION = 1
+
+# The oldest files go once the disk cache holds more than this many
+MAX_CACHE_FILES = 128
+
+_compiled: dict[str, Callable] = {}
+_fingerprints: dict[CodeType, bytes] = {}
+_structs: dict[str, Struct] = {}
+
+
+def rol32_src(x: str, a: int) -> str:
+    a %= 32
+    return f"(({x} << {a} | {x} >> {32 - a}) & 0xFFFFFFFF)"
+
+
+def ror32_src(x: str, a: int) -> str:
+    return rol32_src(x, 32 - a)
+
+
+def rol64_src(x: str, a: int) -> str:
+    a %= 64
+    if a == 0:
+        return x
+    return f"(({x} << {a} | {x} >> {64 - a}) & 0xFFFFFFFFFFFFFFFF)"
+
+
+def ror64_src(x: str, a: int) -> str:
+    a %= 64
+    return f"(({x} >> {a} | {x} << {64 - a}) & 0xFFFFFFFFFFFFFFFF)"
+
+
+def cache_dir() -> str:
+    path = os.environ.get("HASHSOUP_CACHE_DIR")
+    if path is None:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        path = os.path.join(base, "hashsoup")
+    return path
+
+
+def _cache_path(key: str) -> str:
+    path = cache_dir()
+    if not path:
+        return None
+    return os.path.join(path, f"{key}.{sys.implementation.cache_tag}.bin")
+
+
+def _load(key: str):
+    path = _cache_path(key)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _prune(path: str) -> None:
+    try:
+        with os.scandir(path) as it:
+            entries = [e for e in it if e.name.endswith(".bin")]
+        if len(entries) <= MAX_CACHE_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[: len(entries) - MAX_CACHE_FILES]:
+            os.unlink(entry.path)
+    except OSError:
+        pass
+
+
+def _store(key: str, code) -> None:
+    path = _cache_path(key)
+    if path is None:
+        return
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump(code, f)
+        os.replace(tmp, path)
+    except OSError:
+        return
+    _prune(os.path.dirname(path))
+
+
+def source(name: str, lines: list[str]) -> str:
+    body = "".join(f"    {line}\n" for line in lines)
+    return f"# Generated by hashsoup for {name}\ndef compress(H, M):\n{body}"
+
+
+def _fingerprint(code: CodeType) -> bytes:
+    # Same in every process, unlike the repr of nested code objects
+    parts = [code.co_code, repr(code.co_names).encode()]
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            parts.append(_fingerprint(const))
+        else:
+            parts.append(repr(const).encode())
+    return b"\0".join(parts)
+
+
+def _compile(name: str, constants: list, generate: Callable) -> Callable:
+    import hashlib
+
+    # The generator's own bytecode is part of the key, so editing it
+    # invalidates what is cached on disk
+    code = generate.__code__
+    fingerprint = _fingerprints.get(code)
+    if fingerprint is None:
+        fingerprint = _fingerprints[code] = _fingerprint(code)
+    key = repr((VERSION, name, constants)).encode() + fingerprint
+    key = hashlib.sha256(key).hexdigest()
+
+    compress = _compiled.get(key)
+    if compress is None:
+        code = _load(key)
+        if code is None:
+            code = compile(source(name, generate()), f"<hashsoup {name}>", "exec")
+            _store(key, code)
+        namespace = {}
+        exec(code, namespace)
+        compress = _compiled[key] = namespace["compress"]
+    return compress
+
+
+def compressor(hasher, constants: list, generate: Callable) -> Callable:
+    # The instance remembers which constants it was compiled for, so the
+    # common case is a single list comparison
+    compiled = hasher.__dict__.get("_compiled")
+    if compiled is None or compiled[0] != constants:
+        cls = type(hasher)
+        name = f"{cls.__module__}.{cls.__qualname__}"
+        compress = _compile(name, constants, generate)
+        compiled = hasher._compiled = ([c[:] for c in constants], compress)
+    return compiled[1]
+
+
+def chunk_updater(hasher, fmt: str) -> Callable:
+    compress = hasher._compressor()
+    unpack = _structs.get(fmt)
+    if unpack is None:
+        unpack = _structs[fmt] = Struct(fmt).unpack
+
+    def update_chunk(chunk: bytes):
+        hasher.state = compress(hasher.state, unpack(chunk))
+
+    return update_chunk
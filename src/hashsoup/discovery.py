@@ -0,0 +1,148 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import NamedTuple, Optional
+
+from . import registry
+from .extension import extend
+from .hasher import Hasher
+
+# Merkle-Damgard hashers whose digest is their whole state, by digest length
+EXTENDABLE = {
+    16: ("MD4", "MD5", "RIPEMD128"),
+    20: ("SHA1", "RIPEMD160"),
+    32: ("SHA256",),
+    64: ("SHA512",),
+}
+
+# Candidates answered between two writes of the checkpoint
+CHECKPOINT_EVERY = 64
+
+
+class Discovery(NamedTuple):
+    algorithm: str
+    secret_len: int
+    message: bytes
+    digest: bytes
+
+
+def candidate_algorithms(known_digest: bytes) -> list[type[Hasher]]:
+    names = EXTENDABLE.get(len(known_digest), ())
+    assert names, f"No extendable algorithm has a {len(known_digest)}-byte digest"
+    return [registry.get(name) for name in names]
+
+
+def _candidates(
+    algorithms: list[type[Hasher]],
+    known_digest: bytes,
+    known_message: bytes,
+    suffix: bytes,
+    secret_lengths: list[int],
+) -> list[Discovery]:
+    # Every algorithm is tried at a length before any goes to the next one
+    forged = [
+        extend(algorithm, known_digest, known_message, suffix, secret_lengths)
+        for algorithm in algorithms
+    ]
+    return [
+        Discovery(algorithm.__name__, secret_len, *forged[i][j])
+        for j, secret_len in enumerate(secret_lengths)
+        for i, algorithm in enumerate(algorithms)
+    ]
+
+
+def _search_id(candidates: list[Discovery]) -> str:
+    return hashlib.sha256(repr(candidates).encode()).hexdigest()
+
+
+def _load(checkpoint: str, search: str) -> int:
+    try:
+        with open(checkpoint) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return 0
+    assert saved["search"] == search, "The checkpoint is from another search"
+    return saved["next"]
+
+
+def _save(checkpoint: str, search: str, next_: int) -> None:
+    tmp = f"{checkpoint}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"search": search, "next": next_}, f)
+    os.replace(tmp, checkpoint)
+
+
+def discover(
+    oracle: Callable[[bytes, bytes], bool],
+    known_digest: bytes,
+    known_message: bytes,
+    suffix: bytes,
+    secret_lengths: Iterable[int] = range(1, 129),
+    algorithms: Iterable[type[Hasher]] = None,
+    workers: int = None,
+    checkpoint: str = None,
+) -> Optional[Discovery]:
+    # `oracle(message, digest)` stands in for the target and tells whether it
+    # accepts a forgery. Unless given, the algorithms are guessed from the
+    # digest length. With `workers` > 1 the oracle is pickled to the
+    # hash_files() pool and that many forgeries are in flight at once.
+    # `checkpoint` is a JSON file recording how far the search got, so an
+    # interrupted run resumes there. Returns the first accepted forgery.
+    if algorithms is None:
+        algorithms = candidate_algorithms(known_digest)
+    candidates = _candidates(
+        list(algorithms), known_digest, known_message, suffix, list(secret_lengths)
+    )
+    search = _search_id(candidates)
+    start = _load(checkpoint, search) if checkpoint else 0
+
+    # Every candidate before `done` was rejected
+    done = start
+    answered = set()
+    saved = start
+    try:
+        if (workers or 1) == 1:
+            for i in range(start, len(candidates)):
+                if oracle(candidates[i].message, candidates[i].digest):
+                    return candidates[i]
+                done = i + 1
+                if checkpoint and done - saved >= CHECKPOINT_EVERY:
+                    _save(checkpoint, search, done)
+                    saved = done
+            return None
+
+        from .files import _get_pool
+
+        pool = _get_pool(workers, [])
+        pending = {}
+        queued = iter(range(start, len(candidates)))
+        try:
+            while True:
+                for i in queued:
+                    c = candidates[i]
+                    pending[pool.submit(oracle, c.message, c.digest)] = i
+                    if len(pending) >= 2 * workers:
+                        break
+                if not pending:
+                    return None
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    i = pending.pop(future)
+                    if future.result():
+                        return candidates[i]
+                    answered.add(i)
+                while done in answered:
+                    answered.remove(done)
+                    done += 1
+                if checkpoint and done - saved >= CHECKPOINT_EVERY:
+                    _save(checkpoint, search, done)
+                    saved = done
+        finally:
+            for future in pending:
+                future.cancel()
+    finally:
+        if checkpoint and done != saved:
+            _save(checkpoint, search, done)
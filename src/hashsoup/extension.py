@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Iterable
+
+from .hasher import Hasher
+
+
+def extend(
+    algorithm: type[Hasher],
+    known_digest: bytes,
+    known_message: bytes,
+    suffix: bytes,
+    secret_lengths: Iterable[int],
+) -> list[tuple[bytes, bytes]]:
+    # Forge `known_message + glue + suffix` for every guessed secret length
+    assert (
+        len(known_digest) == algorithm.LEN_STATE
+    ), f"The digest must be the full {algorithm.LEN_STATE}-byte state"
+
+    # Full blocks of the suffix do not depend on the secret length,
+    # so they are compressed only once
+    base = algorithm(state=known_digest)
+    base.update(suffix)
+
+    # Secret lengths padding to the same number of blocks share a digest
+    forged = {}
+    candidates = []
+    for secret_len in secret_lengths:
+        len_ = secret_len + len(known_message)
+        glue = algorithm.get_padding(len_)
+        digested = len_ + len(glue)
+        if digested not in forged:
+            hasher = base.copy()
+            hasher.digested += digested
+            forged[digested] = hasher.digest()
+        candidates.append((known_message + glue + suffix, forged[digested]))
+
+    return candidates
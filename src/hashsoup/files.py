@@ -0,0 +1,99 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, NamedTuple, Optional, Union
+
+from .hasher import Hasher
+
+_pool: ProcessPoolExecutor = None
+_pool_workers: int = None
+
+
+class FileResult(NamedTuple):
+    path: str
+    # One digest per algorithm, in the order they were given
+    digests: Optional[list[bytes]]
+    error: Optional[BaseException]
+
+
+def _warm(hashers: list[Hasher]) -> None:
+    # Compiling in this process puts the compression functions in the disk
+    # cache, or straight into the memory of workers forked afterwards
+    for hasher in hashers:
+        hasher.copy()._chunk_updater()
+
+
+def hash_file(file, algorithm: Union[type[Hasher], Hasher]) -> Hasher:
+    # `file` is a path or a binary file object, `algorithm` a class or an
+    # instance to be copied
+    if isinstance(algorithm, Hasher):
+        hasher = algorithm.copy()
+    else:
+        hasher = algorithm()
+    hasher.update_from_file(file)
+    return hasher
+
+
+def _hash_file(path: str, hashers: list[Hasher]) -> list[bytes]:
+    hashers = [hasher.copy() for hasher in hashers]
+    with open(path, "rb") as f:
+        for hasher in hashers:
+            f.seek(0)
+            hasher.update_from_file(f)
+    return [hasher.digest() for hasher in hashers]
+
+
+def _get_pool(workers: int, hashers: list[Hasher]) -> ProcessPoolExecutor:
+    # The pool outlives a call, so later batches skip worker start-up. Every
+    # caller's hashers are warmed, whoever created the pool, and a pool broken
+    # by a dead worker is replaced.
+    global _pool, _pool_workers
+    _warm(hashers)
+    if _pool is None or _pool_workers != workers or _pool._broken:
+        shutdown()
+        _pool = ProcessPoolExecutor(workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown() -> None:
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+    _pool = _pool_workers = None
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def hash_files(
+    paths: Iterable[Union[str, os.PathLike]],
+    algorithms: list[Union[type[Hasher], Hasher]],
+    workers: int = None,
+) -> Iterator[FileResult]:
+    # Yields a FileResult for every path as soon as it is hashed. Algorithms
+    # are classes or instances (e.g. with an injected state), which are
+    # pickled to the workers and copied for every file, so input they
+    # already absorbed acts as a common prefix. A file that cannot
+    # be hashed yields its error instead of digests.
+    hashers = [a if isinstance(a, Hasher) else a() for a in algorithms]
+
+    # Largest files first, so no single big file is left running at the end
+    paths = sorted(map(os.fspath, paths), key=_size, reverse=True)
+
+    pool = _get_pool(workers or os.cpu_count() or 1, hashers)
+    futures = {pool.submit(_hash_file, path, hashers): path for path in paths}
+    try:
+        for future in as_completed(futures):
+            try:
+                result = FileResult(futures[future], future.result(), None)
+            except Exception as e:
+                result = FileResult(futures[future], None, e)
+            yield result
+    finally:
+        for future in futures:
+            future.cancel()
@@ -1,19 +1,404 @@
+from __future__ import annotations
+import copyreg
+import io
+import mmap
+import os
+import stat
+import struct
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+
+from . import registry
+
+# Serialized records are the magic, a version, the algorithm name, its
+# parameters, digested, the chaining state and the tail buffer
+RECORD_MAGIC = b"HS"
+RECORD_VERSION = 1
+
+# Files that cannot be mapped are read in chunks of about this size
+READ_SIZE = 1 << 20
+
+# "auto" compresses whole blocks with libcrypto when it can and in Python
+# otherwise, so the state stays readable, copyable and picklable. "python"
+# never leaves Python. "hashlib" hands hashers in their default configuration
+# to hashlib at the first update(), after which their state is gone, and
+# keeps the others, e.g. with an injected state, in Python.
+BACKENDS = ("auto", "python", "hashlib")
+_backend = os.environ.get("HASHSOUP_BACKEND", "auto")
+_hashlib_constructors = {}
+# Hasher class -> [(attribute, default value)] of its CONST_ tables
+_class_constants = {}
+
+
+def set_backend(backend: str) -> None:
+    global _backend
+    assert backend in BACKENDS, f"Unknown backend {backend}"
+    _backend = backend
+
+
+def get_backend() -> str:
+    return _backend
+
+
+def _hashlib_constructor(name: str):
+    if name not in _hashlib_constructors:
+        import hashlib
+
+        try:
+            hashlib.new(name)
+            constructor = getattr(hashlib, name, None) or (lambda: hashlib.new(name))
+        except ValueError:
+            constructor = None
+        _hashlib_constructors[name] = constructor
+    return _hashlib_constructors[name]
 
 
 class Hasher(ABC):
-    @abstractmethod
+    LEN_BLOCK: int
+    # Name of the same algorithm in hashlib, if it has one
+    HASHLIB_NAME: str = None
+
+    # libcrypto function compressing whole blocks from any state, and the
+    # struct format of the state words, if it has one
+    LIBCRYPTO: tuple = None
+
+    # Per-instance override of the process-wide backend, set before update()
+    backend: str = None
+
+    # Memoized result of digest(), dropped on every update()
+    _digest = None
+    # hashlib object doing the work, False for the pure-Python engine and
+    # None until the first update() decides
+    _native = None
+
     def update(self, inp: bytes) -> None:
-        ...
+        data = memoryview(inp).cast("B")
+        if self._native is None:
+            self._native = self._open_native()
+        self.digested += len(data)
+        self._digest = None
+        if self._native:
+            self._native.update(data)
+        else:
+            self._feed(data)
+
+    def _initial_state(self) -> bool:
+        return self.state == self.CONST_STATE
+
+    def _open_native(self):
+        backend = self.backend or _backend
+        assert backend in BACKENDS, f"Unknown backend {backend}"
+        if backend != "hashlib" or self.HASHLIB_NAME is None:
+            return False
+
+        constructor = _hashlib_constructor(self.HASHLIB_NAME)
+        default = self.digested == 0 and not self.buffer and self._initial_state()
+        if constructor is None or not (default and self._default_constants()):
+            return False
+
+        # From now on the chaining state only exists inside hashlib
+        del self.state, self.buffer
+        return constructor()
+
+    def __getattr__(self, name: str):
+        # Only reached for missing attributes, e.g. the state taken by hashlib
+        if name in ("state", "buffer") and self.__dict__.get("_native"):
+            raise AttributeError(
+                f"{type(self).__name__} runs on hashlib, so its {name} is not"
+                " available; use the auto or python backend"
+            )
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+    def digests_at(self, inp: bytes, offsets: Iterable[int]):
+        # Absorbs `inp`, lazily yielding (offset, digest) for each offset, where
+        # offsets count every byte absorbed so far like `digested` does. The
+        # offsets are checked before anything is absorbed. The generator must
+        # be consumed or closed: the input up to the next offset is absorbed as
+        # it advances, and the rest once it finishes, is closed or collected.
+        data = memoryview(inp).cast("B")
+        start = self.digested
+        offsets = sorted(offsets)
+        for offset in offsets:
+            assert (
+                start <= offset <= start + len(data)
+            ), f"Offset {offset} is outside {start}..{start + len(data)}"
+        checkpoints = self._digests_at(data, start, offsets)
+        next(checkpoints)
+        return checkpoints
+
+    def _digests_at(self, data: memoryview, start: int, offsets: list[int]):
+        pos = 0
+        try:
+            # Primed by digests_at(), so the finally clause always runs
+            yield
+            for offset in offsets:
+                self.update(data[pos : offset - start])
+                pos = offset - start
+                yield offset, self.digest()
+        finally:
+            self.update(data[pos:])
+
+    def update_with_checkpoints(self, inp: bytes, every: int):
+        # digests_at() on every multiple of `every` within `inp`
+        assert every > 0, "every must be positive"
+        end = self.digested + memoryview(inp).nbytes
+        first = (self.digested // every + 1) * every
+        return self.digests_at(inp, range(first, end + 1, every))
+
+    async def update_async(self, inp: bytes, executor=None, batch_size: int = None):
+        # Batched and absorbed in `executor`, see hashsoup.aio. digest() only
+        # sees what was flushed, so finish with digest_async() or flush_async()
+        from . import aio
+
+        await aio.update(self, inp, executor, batch_size)
+
+    async def flush_async(self, executor=None) -> None:
+        from . import aio
+
+        await aio.flush(self, executor)
+
+    async def digest_async(self, executor=None) -> bytes:
+        from . import aio
+
+        return await aio.digest(self, executor)
+
+    def update_from_file(self, file) -> None:
+        # `file` is a path or a binary file object, read from its position
+        if isinstance(file, (str, bytes, os.PathLike)):
+            with open(file, "rb") as f:
+                self.update_from_file(f)
+            return
+
+        try:
+            fd = file.fileno()
+            regular = stat.S_ISREG(os.fstat(fd).st_mode)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            regular = False
+
+        # Files in /proc and /sys report a size of 0 and may not map, so
+        # those are read like pipes
+        if regular:
+            start = file.tell()
+            size = os.fstat(fd).st_size
+            if size and start >= size:
+                return
+            try:
+                mapped = mmap.mmap(fd, size, access=mmap.ACCESS_READ) if size else None
+            except (OSError, ValueError):
+                mapped = None
+            if mapped is not None:
+                with mapped, memoryview(mapped) as data:
+                    self.update(data[start:])
+                file.seek(size)
+                return
+
+        # Pipes and sockets go through one preallocated, block-aligned buffer
+        buffer = bytearray(max(READ_SIZE - READ_SIZE % self.LEN_BLOCK, self.LEN_BLOCK))
+        with memoryview(buffer) as view:
+            while True:
+                n = file.readinto(view)
+                if not n:
+                    break
+                self.update(view[:n])
+
+    def _feed(self, data: memoryview) -> None:
+        # Walk the input by offset, so only the sub-block tail is ever buffered
+        size = self.LEN_BLOCK
+        offset, end = 0, len(data)
+
+        if len(self.buffer) + end < size:
+            self.buffer += data
+            return
+
+        update_blocks = self._blocks_updater()
+        if self.buffer:
+            offset = size - len(self.buffer)
+            self.buffer += data[:offset]
+            update_blocks(self.buffer)
+            self.buffer = bytearray()
+
+        last = end - (end - offset) % size
+        if offset < last:
+            update_blocks(data[offset:last])
+
+        if last < end:
+            self.buffer += data[last:]
+
+    def _blocks_updater(self):
+        # Returns a function compressing a run of whole blocks
+        if self.LIBCRYPTO is not None and (self.backend or _backend) == "auto":
+            from . import native
+
+            update_blocks = native.blocks_updater(self)
+            if update_blocks is not None:
+                return update_blocks
+
+        update_chunk = self._chunk_updater()
+        size = self.LEN_BLOCK
+
+        def update_blocks(data):
+            for i in range(0, len(data), size):
+                update_chunk(data[i : i + size])
+
+        return update_blocks
+
+    def _compresses_in_python(self) -> bool:
+        # Whether update() runs the pure-Python engine, holding the GIL, as
+        # opposed to hashlib or libcrypto. Decides the backend if still open.
+        if self._native is None:
+            self.update(b"")
+        if self._native:
+            return False
+        if self.LIBCRYPTO is not None and (self.backend or _backend) == "auto":
+            from . import native
+
+            return not (native.available(self) and self._default_constants())
+        return True
+
+    def _pad(self) -> None:
+        self._feed(memoryview(self.get_padding(self.digested)))
+
+    def copy(self) -> "Hasher":
+        # Constant tables are duplicated too, so tweaking those of the copy
+        # leaves this hasher alone
+        other = self._copy_state()
+        for name in self._constant_names():
+            table = other.__dict__.get(name)
+            if table is not None:
+                other.__dict__[name] = [
+                    row[:] if isinstance(row, list) else row for row in table
+                ]
+        return other
+
+    def _copy_state(self) -> "Hasher":
+        # Only the running state is duplicated, constant tables are shared.
+        # For copies that never leave the hasher, like the one digest() pads.
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        if self._native:
+            other._native = self._native.copy()
+            return other
+        other.state = self.state[:]
+        other.buffer = self.buffer[:]
+        return other
+
+    @abstractmethod
+    def _update_chunk(self, chunk: bytes) -> None: ...
+
+    def _chunk_updater(self):
+        # Hashers with a compiled compression function override this
+        return self._update_chunk
 
     @abstractmethod
+    def _output(self) -> bytes: ...
+
+    def _native_digest(self) -> bytes:
+        assert self._default_constants(), "Constants were modified on hashlib"
+        return self._native.digest()
+
     def digest(self) -> bytes:
-        ...
+        if self._digest is None and self._native:
+            self._digest = self._native_digest()
+        elif self._digest is None:
+            copy = self._copy_state()
+            copy._pad()
+
+            assert len(copy.buffer) == 0
+
+            self._digest = copy._output()
+        return self._digest
 
     def hexdigest(self) -> str:
         return self.digest().hex()
 
+    @abstractmethod
+    def _state_bytes(self) -> bytes: ...
+
+    def _params(self) -> tuple:
+        return ()
+
+    @classmethod
+    def _from_record(cls, params: tuple, state: bytes, digested: int) -> "Hasher":
+        return cls(state=state, digested=digested)
+
+    @classmethod
+    def _constants(cls) -> list:
+        constants = _class_constants.get(cls)
+        if constants is None:
+            constants = _class_constants[cls] = [
+                (name[6:], getattr(cls, name))
+                for name in dir(cls)
+                if name.startswith("CONST_")
+            ]
+        return constants
+
+    @classmethod
+    def _constant_names(cls) -> list[str]:
+        return [name for name, _ in cls._constants()]
+
+    def _default_constants(self) -> bool:
+        attrs = self.__dict__
+        return all(
+            attrs[name] == value for name, value in self._constants() if name in attrs
+        )
+
+    def to_bytes(self) -> bytes:
+        # Constant tables are not part of the record
+        name = type(self).__name__.encode()
+        params = self._params()
+        state = self._state_bytes()
+        return b"".join(
+            [
+                struct.pack("<2sBB", RECORD_MAGIC, RECORD_VERSION, len(name)),
+                name,
+                struct.pack(f"<B{len(params)}I", len(params), *params),
+                struct.pack("<QH", self.digested, len(state)),
+                state,
+                struct.pack("<H", len(self.buffer)),
+                self.buffer,
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Hasher":
+        data = memoryview(data).cast("B")
+        magic, version, len_name = struct.unpack_from("<2sBB", data)
+        assert magic == RECORD_MAGIC, "Not a hashsoup record"
+        assert version == RECORD_VERSION, f"Unsupported record version {version}"
+        offset = 4
+
+        name = bytes(data[offset : offset + len_name]).decode()
+        offset += len_name
+        num_params = data[offset]
+        params = struct.unpack_from(f"<{num_params}I", data, offset + 1)
+        offset += 1 + 4 * num_params
+        digested, len_state = struct.unpack_from("<QH", data, offset)
+        offset += 10
+        state = bytes(data[offset : offset + len_state])
+        offset += len_state
+        (len_buffer,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        buffer = data[offset : offset + len_buffer]
+
+        target = cls if name == cls.__name__ else registry.get(name)
+        assert issubclass(target, cls), f"The record is for {name}"
+        hasher = target._from_record(params, state, digested)
+        hasher.buffer = bytearray(buffer)
+        return hasher
+
+    def __reduce__(self):
+        if self._default_constants():
+            return _restore, (type(self), self.to_bytes())
+        # Modified constants travel with the whole object
+        state = {k: v for k, v in self.__dict__.items() if k != "_compiled"}
+        return copyreg.__newobj__, (type(self),), state
+
     @classmethod
     @abstractmethod
-    def get_padding(cls, len_: int) -> bytes:
-        ...
+    def get_padding(cls, len_: int) -> bytes: ...
+
+
+def _restore(cls: type, record: bytes) -> Hasher:
+    return cls.from_bytes(record)
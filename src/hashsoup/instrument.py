@@ -0,0 +1,267 @@
+from __future__ import annotations
+import json
+import threading
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter_ns
+
+from . import native, registry
+from .hasher import Hasher
+
+# Opt-in counters and latency histograms, aggregated per algorithm for the
+# whole process. enable() swaps instrumented methods into the hasher classes
+# and disable() puts the originals back, so nothing is paid while disabled.
+
+COUNTERS = ["bytes_absorbed", "buffer_reallocations", "copies", "digests_memoized"]
+HISTOGRAMS = ["update", "compression", "digest", "permutation"]
+
+# Upper bounds of the latency buckets in ns, 256 ns to about 1 s
+BOUNDS = [1 << i for i in range(8, 31)]
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, ns: int, count: int = 1) -> None:
+        self.buckets[bisect_left(BOUNDS, ns)] += count
+        self.count += count
+        self.sum += ns * count
+
+
+class Stats:
+    def __init__(self):
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.histograms = {name: Histogram() for name in HISTOGRAMS}
+
+
+_registry: dict[str, Stats] = {}
+_originals: dict[tuple[object, str], object] = {}
+# Names of the wrapped methods running in this thread, so an override calling
+# its base method is only recorded once
+_active = threading.local()
+
+
+def stats(algorithm: str) -> Stats:
+    result = _registry.get(algorithm)
+    if result is None:
+        result = _registry[algorithm] = Stats()
+    return result
+
+
+def _update(method):
+    @wraps(method)
+    def update(self, inp):
+        start = perf_counter_ns()
+        method(self, inp)
+        s = stats(type(self).__name__)
+        s.histograms["update"].observe(perf_counter_ns() - start)
+        s.counters["bytes_absorbed"] += memoryview(inp).nbytes
+
+    return update
+
+
+def _feed(method):
+    @wraps(method)
+    def _feed(self, data):
+        before = len(self.buffer)
+        method(self, data)
+        if self.buffer and len(self.buffer) != before:
+            stats(type(self).__name__).counters["buffer_reallocations"] += 1
+
+    return _feed
+
+
+def _chunk_updater(method):
+    @wraps(method)
+    def _chunk_updater(self):
+        update_chunk = method(self)
+        histogram = stats(type(self).__name__).histograms["compression"]
+
+        def timed(chunk):
+            start = perf_counter_ns()
+            update_chunk(chunk)
+            histogram.observe(perf_counter_ns() - start)
+
+        return timed
+
+    return _chunk_updater
+
+
+def _outermost(name: str, method, instrumented):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        active = _active.__dict__.setdefault("names", set())
+        if name in active:
+            return method(self, *args, **kwargs)
+        active.add(name)
+        try:
+            return instrumented(self, *args, **kwargs)
+        finally:
+            active.discard(name)
+
+    return wrapper
+
+
+def _copy_state(method):
+    def _copy_state(self, *args, **kwargs):
+        stats(type(self).__name__).counters["copies"] += 1
+        return method(self, *args, **kwargs)
+
+    return _outermost("_copy_state", method, _copy_state)
+
+
+def _digest(method):
+    def digest(self, *args, **kwargs):
+        # An output length, as SHAKE takes, bypasses the memoized digest
+        if self._digest is not None and not any(args) and not kwargs:
+            stats(type(self).__name__).counters["digests_memoized"] += 1
+            return method(self, *args, **kwargs)
+        start = perf_counter_ns()
+        result = method(self, *args, **kwargs)
+        stats(type(self).__name__).histograms["digest"].observe(
+            perf_counter_ns() - start
+        )
+        return result
+
+    return _outermost("digest", method, digest)
+
+
+def _native_blocks(function):
+    # libcrypto compresses a whole run at once, so every block in it is
+    # recorded with the average time
+    @wraps(function)
+    def blocks_updater(hasher):
+        update_blocks = function(hasher)
+        if update_blocks is None:
+            return None
+        histogram = stats(type(hasher).__name__).histograms["compression"]
+        size = hasher.LEN_BLOCK
+
+        def timed(data):
+            start = perf_counter_ns()
+            update_blocks(data)
+            n = len(data) // size
+            histogram.observe((perf_counter_ns() - start) // n, n)
+
+        return timed
+
+    return blocks_updater
+
+
+def _timed(name: str):
+    def wrap(method):
+        @wraps(method)
+        def timed(self):
+            start = perf_counter_ns()
+            method(self)
+            stats(type(self).__name__).histograms[name].observe(
+                perf_counter_ns() - start
+            )
+
+        return timed
+
+    return wrap
+
+
+# Method name -> wrapper, applied wherever a hasher class defines the method
+WRAPPERS = {
+    "update": _update,
+    "_feed": _feed,
+    "_chunk_updater": _chunk_updater,
+    "_copy_state": _copy_state,
+    "digest": _digest,
+    "_permute": _timed("permutation"),
+}
+
+
+def _classes(cls: type):
+    yield cls
+    for sub in cls.__subclasses__():
+        yield from _classes(sub)
+
+
+def enabled() -> bool:
+    return bool(_originals)
+
+
+def enable() -> None:
+    # The package loads algorithms lazily, so every built-in one is imported
+    # here. Hasher subclasses defined after this call are not instrumented.
+    if enabled():
+        return
+    for name in registry.ALGORITHMS:
+        registry.get(name)
+    for cls in set(_classes(Hasher)):
+        for name, wrapper in WRAPPERS.items():
+            method = cls.__dict__.get(name)
+            if method is not None:
+                _originals[cls, name] = method
+                setattr(cls, name, wrapper(method))
+    _originals[native, "blocks_updater"] = native.blocks_updater
+    native.blocks_updater = _native_blocks(native.blocks_updater)
+
+
+def disable() -> None:
+    for (cls, name), method in _originals.items():
+        setattr(cls, name, method)
+    _originals.clear()
+
+
+def reset() -> None:
+    _registry.clear()
+
+
+def to_dict() -> dict:
+    return {
+        algorithm: {
+            "counters": dict(s.counters),
+            "histograms": {
+                name: {
+                    "count": h.count,
+                    "sum_ns": h.sum,
+                    "buckets": dict(zip(BOUNDS + ["+Inf"], h.buckets)),
+                }
+                for name, h in s.histograms.items()
+            },
+        }
+        for algorithm, s in sorted(_registry.items())
+    }
+
+
+def to_json() -> str:
+    return json.dumps(to_dict(), indent=2)
+
+
+def to_prometheus() -> str:
+    lines = []
+    for counter in COUNTERS:
+        metric = f"hashsoup_{counter}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for algorithm, s in sorted(_registry.items()):
+            lines.append(f'{metric}{{algorithm="{algorithm}"}} {s.counters[counter]}')
+
+    for name in HISTOGRAMS:
+        metric = f"hashsoup_{name}_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for algorithm, s in sorted(_registry.items()):
+            h = s.histograms[name]
+            label = f'algorithm="{algorithm}"'
+            total = 0
+            for bound, count in zip(BOUNDS + [None], h.buckets):
+                total += count
+                le = "+Inf" if bound is None else f"{bound / 1e9:g}"
+                lines.append(f'{metric}_bucket{{{label},le="{le}"}} {total}')
+            lines.append(f"{metric}_sum{{{label}}} {h.sum / 1e9:g}")
+            lines.append(f"{metric}_count{{{label}}} {h.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def dump(path: str, format: str = "json") -> None:
+    assert format in ("json", "prometheus"), f"Unknown format {format}"
+    text = to_json() if format == "json" else to_prometheus()
+    with open(path, "w") as f:
+        f.write(text)
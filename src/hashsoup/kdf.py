@@ -0,0 +1,107 @@
+from __future__ import annotations
+import hashlib
+import os
+from struct import Struct
+from typing import Union
+
+from . import hasher as _hasher
+from .hasher import Hasher
+from .mac import HMAC, midstates
+
+
+def _python_base(algorithm: Union[type[Hasher], Hasher]) -> Hasher:
+    base = algorithm.copy() if isinstance(algorithm, Hasher) else algorithm()
+    base.backend = "python"
+    return base
+
+
+def _fast_loop(base: Hasher, password: bytes, u: bytes, iterations: int):
+    # Returns U_2 ^ ... ^ U_c, or None when the digest is not a prefix of the
+    # state words in block byte order
+    fmt = getattr(base, "BLOCK_FORMAT", None)
+    if fmt is None or not hasattr(base, "_compressor"):
+        return None
+
+    inner, outer = midstates(password, base)
+    size = Struct(fmt).size // int(fmt[1:-1])
+    n = len(u) // size
+    digest = Struct(f"{fmt[0]}{n}{fmt[-1]}")
+    if len(u) % size or digest.pack(*inner.state[:n]) != inner._output()[: len(u)]:
+        return None
+
+    # Every message is one digest, so each block is those words followed by
+    # the same padding words
+    block = bytes(len(u)) + base.get_padding(base.LEN_BLOCK + len(u))
+    assert len(block) == base.LEN_BLOCK, "The digest must fit in one block"
+    pad = Struct(fmt).unpack(block)[n:]
+
+    compress = inner._compressor()
+    ipad, opad = inner.state, outer.state
+    u = digest.unpack(u)
+    t = [0] * n
+    for _ in range(iterations - 1):
+        u = compress(opad, (*compress(ipad, (*u, *pad))[:n], *pad))[:n]
+        t = [a ^ b for a, b in zip(t, u)]
+    return digest.pack(*t)
+
+
+def _block(
+    algorithm: Union[type[Hasher], Hasher],
+    password: bytes,
+    salt: bytes,
+    iterations: int,
+    index: int,
+) -> bytes:
+    # T_index = U_1 ^ U_2 ^ ... ^ U_c
+    base = _python_base(algorithm)
+    mac = HMAC(password, base)
+    u = mac.sign(salt + index.to_bytes(4, "big"))
+    rest = _fast_loop(base, password, u, iterations)
+    if rest is not None:
+        return bytes(a ^ b for a, b in zip(u, rest))
+
+    t = u
+    for _ in range(iterations - 1):
+        u = mac.sign(u)
+        t = bytes(a ^ b for a, b in zip(t, u))
+    return t
+
+
+def pbkdf2_hmac(
+    algorithm: Union[type[Hasher], Hasher],
+    password: bytes,
+    salt: bytes,
+    iterations: int,
+    dklen: int = None,
+    workers: int = None,
+) -> bytes:
+    # `algorithm` is a class or a fresh instance, e.g. with modified constants.
+    # Output blocks run on the hash_files() pool when there are several.
+    assert iterations >= 1, "iterations must be positive"
+    base = algorithm.copy() if isinstance(algorithm, Hasher) else algorithm()
+    len_digest = len(base.digest())
+    dklen = dklen or len_digest
+    password, salt = bytes(password), bytes(salt)
+
+    # Default configurations go to hashlib when the auto backend allows
+    name = base.HASHLIB_NAME
+    backend = base.backend or _hasher.get_backend()
+    default = base.digested == 0 and base._initial_state()
+    if backend == "auto" and name and default and base._default_constants():
+        try:
+            return hashlib.pbkdf2_hmac(name, password, salt, iterations, dklen)
+        except ValueError:
+            pass
+
+    indices = range(1, -(-dklen // len_digest) + 1)
+    if len(indices) == 1 or workers == 1:
+        blocks = [_block(base, password, salt, iterations, i) for i in indices]
+    else:
+        from .files import _get_pool
+
+        pool = _get_pool(workers or os.cpu_count() or 1, [_python_base(base)])
+        futures = [
+            pool.submit(_block, base, password, salt, iterations, i) for i in indices
+        ]
+        blocks = [future.result() for future in futures]
+    return b"".join(blocks)[:dklen]
@@ -1,9 +1,12 @@
 from __future__ import annotations
-from copy import deepcopy
+import struct
+from io import IOBase
 
+from .codegen import chunk_updater, compressor, rol64_src
 from .hasher import Hasher
 from .utils import rol, xorsum
 
+
 # Implementation mostly from https://keccak.team/files/Keccak-implementation-3.2.pdf
 # TODO: Rename constants
 class Keccak(Hasher):
@@ -33,12 +36,21 @@ class Keccak(Hasher):
     ]
     # fmt: on
 
-    def __init__(self, r: int, c: int, d: int, inp: bytes = None, digested: int = None):
+    def __init__(
+        self,
+        r: int,
+        c: int,
+        d: int = None,
+        inp: bytes = None,
+        digested: int = None,
+        state: bytes = None,
+    ):
         # This allows users to modify constants when they want
         # General constants
         assert r % 8 == 0, "r % 8 must be 0 (fits into bytes)"
-        assert d % 8 == 0, "d % 8 must be 0 (fits into bytes)"
+        assert d is None or d % 8 == 0, "d % 8 must be 0 (fits into bytes)"
         self.b = r + c
+        self.c = c
         self.w = self.b // 25
         self.d = d
         assert r % self.w == 0, "r % w must be 0 (fits into words)"
@@ -52,10 +64,17 @@ class Keccak(Hasher):
         self.r = self.CONST_r[:]
 
         self.state = [[0 for j in range(5)] for i in range(5)]
+        if state:
+            len_state = (self.b + 7) // 8
+            assert len(state) == len_state, f"The state must be {len_state}-byte"
+            v = int.from_bytes(state, "little")
+            for j in range(25):
+                x, y = j % 5, j // 5
+                self.state[x][y] = (v >> (self.w * j)) & self.mask
 
         self.buffer = bytearray()
         self.digested = digested or 0
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     def _f(self) -> None:
@@ -84,27 +103,88 @@ class Keccak(Hasher):
         # Iota step
         A[0][0] = (A[0][0] ^ RC) & self.mask
 
-    def _absorbing_phase(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            Pi = int.from_bytes(self.buffer[: self.LEN_BLOCK], "little")
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-            for j in range(self.num_words):
-                x, y = j % 5, j // 5
-                v = (Pi >> (self.w * j)) & self.mask
-                self.state[x][y] ^= v
+    def _update_chunk(self, chunk: bytes):
+        # Absorbing phase, one block at a time
+        Pi = int.from_bytes(chunk, "little")
+        for j in range(self.num_words):
+            x, y = j % 5, j // 5
+            v = (Pi >> (self.w * j)) & self.mask
+            self.state[x][y] ^= v
+        self._f()
+
+    def _source(self) -> list[str]:
+        # Keccak-f[1600] unrolled over flat lanes a{x + 5 * y}, after absorbing M
+        lanes = [[f"a{x + 5 * y}" for y in range(5)] for x in range(5)]
+        lines = [", ".join(f"({', '.join(row)})" for row in lanes) + " = H"]
+        lines.append("".join(f"M{j}, " for j in range(self.num_words)) + "= M")
+        for j in range(self.num_words):
+            lines.append(f"a{j} ^= M{j}")
+
+        for i in range(self.nr):
+            # Theta step
+            for x in range(5):
+                lines.append(f"c{x} = " + " ^ ".join(f"a{x + 5 * y}" for y in range(5)))
+            for x in range(5):
+                C = rol64_src(f"c{(x + 1) % 5}", 1)
+                lines.append(f"d{x} = c{(x - 1) % 5} ^ {C}")
+
+            # Rho & phi step
+            for x in range(5):
+                for y in range(5):
+                    lines.append(f"t = a{x + 5 * y} ^ d{x}")
+                    B = rol64_src("t", self.r[x][y])
+                    lines.append(f"b{y + 5 * ((2 * x + 3 * y) % 5)} = {B}")
+
+            # Chi step
+            for x in range(5):
+                for y in range(5):
+                    b0, b1, b2 = (f"b{(x + k) % 5 + 5 * y}" for k in range(3))
+                    lines.append(f"a{x + 5 * y} = {b0} ^ (~{b1} & {b2})")
+
+            # Iota step
+            lines.append(f"a0 ^= {self.RC[i] & self.mask:#x}")
+
+        state = ", ".join(f"[{', '.join(row)}]" for row in lanes)
+        lines.append(f"return [{state}]")
+        return lines
+
+    def _compressor(self):
+        r = [v for row in self.r for v in row]
+        return compressor(self, [self.RC, r, [self.num_words, self.nr]], self._source)
+
+    def _chunk_updater(self):
+        # Keccak-f[1600] absorbs lanes straight from the input
+        if self.w != 64:
+            return self._update_chunk
+        return chunk_updater(self, f"<{self.num_words}Q")
+
+    def _permute(self) -> None:
+        if self.w != 64:
             self._f()
+            return
+        # Absorbing zero lanes is a bare permutation
+        self.state = self._compressor()(self.state, (0,) * self.num_words)
+
+    def _rate_bytes(self) -> bytes:
+        # The first r bits of the state, as squeezed out
+        if self.w == 64:
+            lanes = (self.state[j % 5][j // 5] for j in range(self.num_words))
+            return struct.pack(f"<{self.num_words}Q", *lanes)
+        v = 0
+        for j in range(self.num_words):
+            x, y = j % 5, j // 5
+            v |= self.state[x][y] << (self.w * j)
+        return v.to_bytes(self.num_words * self.w // 8, "little")
 
     def _squeezing_phase(self):
-        Z = b""
-        while len(Z) < (self.d >> 3):
-            v = 0
-            for j in range(self.num_words):
-                x, y = j % 5, j // 5
-                v |= self.state[x][y] << (self.w * j)
-            Z += v.to_bytes(self.LEN_BLOCK, "little")
-            self._f()
+        return KeccakReader(self).read(self.d >> 3)
 
-        return Z[: self.d >> 3]
+    def reader(self) -> KeccakReader:
+        # Squeezes from a padded copy, so this hasher can keep absorbing
+        assert not self._native, "The hashlib backend cannot squeeze incrementally"
+        copy = self._copy_state()
+        copy._pad()
+        return KeccakReader(copy)
 
     @classmethod
     def get_padding(cls, len_: int) -> bytes:
@@ -115,70 +195,168 @@ class Keccak(Hasher):
         padding += b"\x80"
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
+    def _copy_state(self) -> Keccak:
+        other = super()._copy_state()
+        if not self._native:
+            other.state = [row[:] for row in self.state]
+        return other
 
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._absorbing_phase()
+    def _initial_state(self) -> bool:
+        return not any(map(any, self.state))
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._absorbing_phase()
-        assert len(copy.buffer) == 0
-        return copy._squeezing_phase()
+    def _default_constants(self) -> bool:
+        # The number of rounds can be changed like the tables
+        nr = 10 + 2 * self.w.bit_length()
+        return self.nr == nr and super()._default_constants()
+
+    def _output(self) -> bytes:
+        assert self.d is not None, "The output length must be given"
+        return self._squeezing_phase()
+
+    def _state_bytes(self) -> bytes:
+        v = 0
+        for j in range(25):
+            x, y = j % 5, j // 5
+            v |= self.state[x][y] << (self.w * j)
+        return v.to_bytes((self.b + 7) // 8, "little")
+
+    def _params(self) -> tuple:
+        return (self.b - self.c, self.c, self.d or 0)
+
+    @classmethod
+    def _from_record(cls, params: tuple, state: bytes, digested: int) -> Keccak:
+        # Subclasses fix some parameters in their constructors
+        hasher = cls.__new__(cls)
+        r, c, d = params
+        Keccak.__init__(hasher, r, c, d or None, digested=digested, state=state)
+        return hasher
 
 
 class SHA3_224(Keccak):
     LEN_BLOCK = 1152 // 8
     PAD_BYTE = 0x06
+    HASHLIB_NAME = "sha3_224"
 
-    def __init__(self, inp: bytes = None, digested: int = None):
-        super().__init__(1152, 448, 224, inp, digested)
+    def __init__(self, inp: bytes = None, digested: int = None, state: bytes = None):
+        super().__init__(1152, 448, 224, inp, digested, state)
 
 
 class SHA3_256(Keccak):
     LEN_BLOCK = 1088 // 8
     PAD_BYTE = 0x06
+    HASHLIB_NAME = "sha3_256"
 
-    def __init__(self, inp: bytes = None, digested: int = None):
-        super().__init__(1088, 512, 256, inp, digested)
+    def __init__(self, inp: bytes = None, digested: int = None, state: bytes = None):
+        super().__init__(1088, 512, 256, inp, digested, state)
 
 
 class SHA3_384(Keccak):
     LEN_BLOCK = 832 // 8
     PAD_BYTE = 0x06
+    HASHLIB_NAME = "sha3_384"
 
-    def __init__(self, inp: bytes = None, digested: int = None):
-        super().__init__(832, 768, 384, inp, digested)
+    def __init__(self, inp: bytes = None, digested: int = None, state: bytes = None):
+        super().__init__(832, 768, 384, inp, digested, state)
 
 
 class SHA3_512(Keccak):
     LEN_BLOCK = 576 // 8
     PAD_BYTE = 0x06
-
-    def __init__(self, inp: bytes = None, digested: int = None):
-        super().__init__(576, 1024, 512, inp, digested)
-
-
-# Python hashlib's shake_128 and shake_256 have a different structure
-# that receives an argument `length` on `digest()` and `hexdigest()`
-# May need to change :(
-
-
-class SHAKE_128(Keccak):
+    HASHLIB_NAME = "sha3_512"
+
+    def __init__(self, inp: bytes = None, digested: int = None, state: bytes = None):
+        super().__init__(576, 1024, 512, inp, digested, state)
+
+
+class KeccakReader:
+    # Squeezing phase of a padded sponge, continued across reads
+    def __init__(self, hasher: Keccak):
+        assert len(hasher.buffer) == 0, "The hasher must be padded"
+        self.hasher = hasher
+        self.block = hasher._rate_bytes()
+        self.offset = 0
+        self.squeezed = 0
+
+    def _next_block(self) -> None:
+        self.hasher._permute()
+        self.block = self.hasher._rate_bytes()
+        self.offset = 0
+
+    def readinto(self, buf) -> int:
+        out = memoryview(buf).cast("B")
+        size, end = len(self.block), len(out)
+        pos = 0
+        while pos < end:
+            if self.offset == size:
+                self._next_block()
+            n = min(size - self.offset, end - pos)
+            out[pos : pos + n] = self.block[self.offset : self.offset + n]
+            self.offset += n
+            pos += n
+        self.squeezed += end
+        return end
+
+    def read(self, n: int) -> bytes:
+        out = bytearray(n)
+        self.readinto(out)
+        return bytes(out)
+
+    def write_to(self, f: IOBase, n: int, chunk_size: int = 1 << 20) -> int:
+        # Streams `n` bytes into a file through one reused buffer
+        chunk = memoryview(bytearray(min(n, chunk_size)))
+        left = n
+        while left:
+            view = chunk[: min(left, len(chunk))]
+            self.readinto(view)
+            f.write(view)
+            left -= len(view)
+        return n
+
+
+class SHAKE(Keccak):
+    # Like hashlib's shake_128 and shake_256, the output length in bytes may
+    # be given on `digest()` and `hexdigest()` instead of construction
+    def digest(self, length: int = None) -> bytes:
+        if length is None:
+            return super().digest()
+        if self._native:
+            return self._native.digest(length)
+        return self.reader().read(length)
+
+    def _native_digest(self) -> bytes:
+        assert self.d is not None, "The output length must be given"
+        assert self._default_constants(), "Constants were modified on hashlib"
+        return self._native.digest(self.d >> 3)
+
+    def hexdigest(self, length: int = None) -> str:
+        return self.digest(length).hex()
+
+
+class SHAKE_128(SHAKE):
     LEN_BLOCK = 1344 // 8
     PAD_BYTE = 0x1F
+    HASHLIB_NAME = "shake_128"
 
-    def __init__(self, d: int, inp: bytes = None, digested: int = None):
-        super().__init__(1344, 256, d, inp, digested)
+    def __init__(
+        self,
+        d: int = None,
+        inp: bytes = None,
+        digested: int = None,
+        state: bytes = None,
+    ):
+        super().__init__(1344, 256, d, inp, digested, state)
 
 
-class SHAKE_256(Keccak):
+class SHAKE_256(SHAKE):
     LEN_BLOCK = 1088 // 8
     PAD_BYTE = 0x1F
-
-    def __init__(self, d: int, inp: bytes = None, digested: int = None):
-        super().__init__(1088, 512, d, inp, digested)
+    HASHLIB_NAME = "shake_256"
+
+    def __init__(
+        self,
+        d: int = None,
+        inp: bytes = None,
+        digested: int = None,
+        state: bytes = None,
+    ):
+        super().__init__(1088, 512, d, inp, digested, state)
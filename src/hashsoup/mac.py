@@ -0,0 +1,102 @@
+from __future__ import annotations
+from collections import OrderedDict
+from secrets import compare_digest
+from typing import Iterable, Union
+
+from . import hasher as _hasher
+from .hasher import Hasher
+
+# Keys whose ipad/opad midstates are kept, least recently used dropped first
+MAX_CACHED_KEYS = 256
+
+_midstates: OrderedDict = OrderedDict()
+
+
+def _key_midstates(key: bytes, base: Hasher) -> tuple[Hasher, Hasher]:
+    # The hashers right after absorbing the ipad and opad key blocks
+    size = base.LEN_BLOCK
+    if len(key) > size:
+        long_key = base.copy()
+        long_key.update(key)
+        key = long_key.digest()
+    key = key.ljust(size, b"\x00")
+
+    inner, outer = base.copy(), base.copy()
+    inner.update(bytes(k ^ 0x36 for k in key))
+    outer.update(bytes(k ^ 0x5C for k in key))
+    return inner, outer
+
+
+def midstates(key: bytes, algorithm: Union[type[Hasher], Hasher]):
+    base = algorithm if isinstance(algorithm, Hasher) else algorithm()
+    assert base.digested == 0, "The hasher must not have absorbed input"
+
+    # Only default constants and states are shared through the cache, since
+    # the key would otherwise have to carry every table
+    if not (base._default_constants() and base._initial_state()):
+        return _key_midstates(key, base)
+
+    cache_key = (type(base), base._params(), base.backend or _hasher.get_backend(), key)
+    result = _midstates.get(cache_key)
+    if result is None:
+        result = _midstates[cache_key] = _key_midstates(key, base)
+        if len(_midstates) > MAX_CACHED_KEYS:
+            _midstates.popitem(last=False)
+    else:
+        _midstates.move_to_end(cache_key)
+    return result
+
+
+class HMAC:
+    def __init__(
+        self,
+        key: bytes,
+        algorithm: Union[type[Hasher], Hasher],
+        msg: bytes = None,
+    ):
+        # `algorithm` is a class or a fresh instance, e.g. with modified
+        # constants. The midstates are shared and only ever copied.
+        key = bytes(key)
+        self._inner_start, self._outer_start = midstates(key, algorithm)
+        self.inner = self._inner_start.copy()
+        if msg is not None:
+            self.update(msg)
+
+    def update(self, msg: bytes) -> None:
+        self.inner.update(msg)
+
+    def copy(self) -> HMAC:
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other.inner = self.inner.copy()
+        return other
+
+    def _finish(self, inner: Hasher) -> bytes:
+        outer = self._outer_start.copy()
+        outer.update(inner.digest())
+        return outer.digest()
+
+    def digest(self) -> bytes:
+        return self._finish(self.inner)
+
+    def hexdigest(self) -> str:
+        return self.digest().hex()
+
+    def sign(self, msg: bytes) -> bytes:
+        # MAC of `msg` alone, ignoring what was passed to update()
+        inner = self._inner_start.copy()
+        inner.update(msg)
+        return self._finish(inner)
+
+    def sign_many(self, messages: Iterable[bytes]) -> list[bytes]:
+        return [self.sign(msg) for msg in messages]
+
+    def verify(self, msg: bytes, mac: bytes) -> bool:
+        return compare_digest(self.sign(msg), mac)
+
+    def verify_many(
+        self, messages: Iterable[bytes], macs: Iterable[bytes]
+    ) -> list[bool]:
+        messages, macs = list(messages), list(macs)
+        assert len(messages) == len(macs), "Every message needs a MAC"
+        return [self.verify(msg, mac) for msg, mac in zip(messages, macs)]
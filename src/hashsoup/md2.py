@@ -1,5 +1,3 @@
-from copy import deepcopy
-
 from .hasher import Hasher
 
 
@@ -33,7 +31,6 @@ class MD2(Hasher):
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
         # This allows users to modify constants when they want
         self.S = self.CONST_S[:]
-        self.L = 0
         if state:
             assert (
                 len(state) == self.LEN_STATE
@@ -43,10 +40,14 @@ class MD2(Hasher):
         else:
             self.D = bytearray(48)
             self.C = bytearray(16)
+        # The last checksum byte carries over between blocks
+        self.L = self.C[-1]
 
         self.buffer = bytearray()
+        # Store byte length
+        self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -55,16 +56,8 @@ class MD2(Hasher):
         return bytes(c for _ in range(c))
 
     def _pad(self):
-        self.buffer += self.get_padding(len(self.buffer))
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
+        self._feed(memoryview(self.get_padding(len(self.buffer))))
+        self._feed(memoryview(bytes(self.C)))
 
     def _update_chunk(self, chunk: bytes):
         for i, c in enumerate(chunk):
@@ -80,12 +73,18 @@ class MD2(Hasher):
                 t = self.D[i]
             t = (t + j) & 0xFF
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
-        copy.update(bytes(copy.C))
+    def _copy_state(self) -> "MD2":
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other.D, other.C = self.D[:], self.C[:]
+        other.buffer = self.buffer[:]
+        return other
+
+    def _output(self) -> bytes:
+        return bytes(self.D[:16])
 
-        assert len(copy.buffer) == 0
+    def _state_bytes(self) -> bytes:
+        return bytes(self.D[:16] + self.C)
 
-        return bytes(copy.D[:16])
+    def _initial_state(self) -> bool:
+        return not any(self.D[:16]) and not any(self.C)
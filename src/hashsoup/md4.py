@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, rol32_src
 from .hasher import Hasher
 from .utils import rol32
 
@@ -30,6 +31,9 @@ class MD4(Hasher):
 
     LEN_STATE = 16
     LEN_BLOCK = 64
+    BLOCK_FORMAT = "<16I"
+    HASHLIB_NAME = "md4"
+    LIBCRYPTO = ("MD4_Update", "I")
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -51,7 +55,7 @@ class MD4(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -61,19 +65,6 @@ class MD4(Hasher):
         padding += (len_ * 8).to_bytes(8, "little")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         M = [int.from_bytes(chunk[i : i + 4], "little") for i in range(0, 64, 4)]
         A, B, C, D = self.state
@@ -98,11 +89,40 @@ class MD4(Hasher):
             (self.state[3] + D) & 0xFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3 = A, B, C, D = H"]
+        lines.append(", ".join(f"M{i}" for i in range(16)) + " = M")
+
+        A, B, C, D = "A", "B", "C", "D"
+        for i in range(48):
+            if i < 16:
+                F = f"{D} ^ ({B} & ({C} ^ {D}))"
+                K = self.C[0]
+            elif i < 32:
+                F = f"({B} & {C}) | ({C} & {D}) | ({B} & {D})"
+                K = self.C[1]
+            else:
+                F = f"{B} ^ {C} ^ {D}"
+                K = self.C[2]
+            lines.append(f"{A} = (({F}) + {A} + {K:#x} + M{self.g[i]}) & 0xFFFFFFFF")
+            lines.append(f"{A} = {rol32_src(A, self.s[i])}")
+            A, B, C, D = D, A, B, C
+
+        lines.append(
+            f"return [(H0 + {A}) & 0xFFFFFFFF, (H1 + {B}) & 0xFFFFFFFF,"
+            f" (H2 + {C}) & 0xFFFFFFFF, (H3 + {D}) & 0xFFFFFFFF]"
+        )
+        return lines
+
+    def _compressor(self):
+        return compressor(self, [self.s, self.g, self.C], self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
 
-        assert len(copy.buffer) == 0
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
 
-        return b"".join(v.to_bytes(4, "little") for v in copy.state)
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
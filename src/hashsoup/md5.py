@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, rol32_src
 from .hasher import Hasher
 from .utils import rol32
 
@@ -40,6 +41,9 @@ class MD5(Hasher):
 
     LEN_STATE = 16
     LEN_BLOCK = 64
+    BLOCK_FORMAT = "<16I"
+    HASHLIB_NAME = "md5"
+    LIBCRYPTO = ("MD5_Update", "I")
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -60,7 +64,7 @@ class MD5(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -70,19 +74,6 @@ class MD5(Hasher):
         padding += (len_ * 8).to_bytes(8, "little")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         M = [int.from_bytes(chunk[i : i + 4], "little") for i in range(0, 64, 4)]
         A, B, C, D = self.state
@@ -111,11 +102,43 @@ class MD5(Hasher):
             (self.state[3] + D) & 0xFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3 = A, B, C, D = H"]
+        lines.append(", ".join(f"M{i}" for i in range(16)) + " = M")
+
+        A, B, C, D = "A", "B", "C", "D"
+        for i in range(64):
+            if i < 16:
+                F = f"{D} ^ ({B} & ({C} ^ {D}))"
+                g = i
+            elif i < 32:
+                F = f"{C} ^ ({D} & ({B} ^ {C}))"
+                g = (5 * i + 1) % 16
+            elif i < 48:
+                F = f"{B} ^ {C} ^ {D}"
+                g = (3 * i + 5) % 16
+            else:
+                F = f"{C} ^ ({B} | ~{D})"
+                g = 7 * i % 16
+            lines.append(f"{A} = (({F}) + {A} + {self.K[i]:#x} + M{g}) & 0xFFFFFFFF")
+            lines.append(f"{A} = ({B} + {rol32_src(A, self.s[i])}) & 0xFFFFFFFF")
+            A, B, C, D = D, A, B, C
+
+        lines.append(
+            f"return [(H0 + {A}) & 0xFFFFFFFF, (H1 + {B}) & 0xFFFFFFFF,"
+            f" (H2 + {C}) & 0xFFFFFFFF, (H3 + {D}) & 0xFFFFFFFF]"
+        )
+        return lines
+
+    def _compressor(self):
+        return compressor(self, [self.K, self.s], self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
 
-        assert len(copy.buffer) == 0
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
 
-        return b"".join(v.to_bytes(4, "little") for v in copy.state)
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
@@ -0,0 +1,158 @@
+from __future__ import annotations
+from secrets import compare_digest
+from typing import Iterable, List, Sequence, Tuple, Union
+
+from .hasher import Hasher
+from .sha256 import SHA256
+
+# Leaves are hashed as H(leaf_prefix + data) and interior nodes as
+# H(node_prefix + left + right). A node without a right sibling is promoted
+# to the next level unchanged. Each level is one bytearray of digests.
+
+# Leaves hashed per task when a batch goes to the process pool
+LEAVES_PER_TASK = 4096
+
+Proof = List[Tuple[bool, bytes]]
+
+
+def _hash_leaves(base: Hasher, prefix: bytes, items: Sequence[bytes]) -> bytes:
+    digests = []
+    for data in items:
+        hasher = base.copy()
+        hasher.update(prefix)
+        hasher.update(data)
+        digests.append(hasher.digest())
+    return b"".join(digests)
+
+
+class MerkleTree:
+    def __init__(
+        self,
+        algorithm: Union[type[Hasher], Hasher] = SHA256,
+        leaves: Iterable[bytes] = (),
+        leaf_prefix: bytes = b"\x00",
+        node_prefix: bytes = b"\x01",
+        workers: int = None,
+    ):
+        # `algorithm` is a class or a fresh instance, e.g. with modified
+        # constants; `workers` > 1 hashes large batches of leaves in parallel
+        self.base = algorithm.copy() if isinstance(algorithm, Hasher) else algorithm()
+        self.len_digest = len(self.base.digest())
+        self.leaf_prefix = bytes(leaf_prefix)
+        self.node_prefix = bytes(node_prefix)
+        self.workers = workers
+        self.levels = [bytearray()]
+        self.extend(leaves)
+
+    def __len__(self) -> int:
+        return len(self.levels[0]) // self.len_digest
+
+    def _node(self, level: int, index: int) -> bytes:
+        d = self.len_digest
+        return bytes(self.levels[level][index * d : (index + 1) * d])
+
+    def _hash_node(self, left: bytes, right: bytes) -> bytes:
+        hasher = self.base.copy()
+        hasher.update(self.node_prefix + left + right)
+        return hasher.digest()
+
+    def _hash_leaves(self, items: list[bytes]) -> bytes:
+        workers = self.workers or 1
+        if workers == 1 or len(items) <= LEAVES_PER_TASK:
+            return _hash_leaves(self.base, self.leaf_prefix, items)
+
+        from .files import _get_pool
+
+        pool = _get_pool(workers, [self.base])
+        futures = [
+            pool.submit(
+                _hash_leaves,
+                self.base,
+                self.leaf_prefix,
+                items[i : i + LEAVES_PER_TASK],
+            )
+            for i in range(0, len(items), LEAVES_PER_TASK)
+        ]
+        return b"".join(future.result() for future in futures)
+
+    def _rebuild(self, first: int, last: int) -> None:
+        # Recomputes the parents of leaves first..last up to the root
+        d = self.len_digest
+        level = 0
+        while len(self.levels[level]) > d:
+            if level + 1 == len(self.levels):
+                self.levels.append(bytearray())
+            nodes, parents = self.levels[level], self.levels[level + 1]
+            count = len(nodes) // d
+
+            first, last = first // 2, last // 2
+            for p in range(first, last + 1):
+                left = bytes(nodes[2 * p * d : (2 * p + 1) * d])
+                if 2 * p + 1 < count:
+                    right = bytes(nodes[(2 * p + 1) * d : (2 * p + 2) * d])
+                    left = self._hash_node(left, right)
+                parents[p * d : (p + 1) * d] = left
+            level += 1
+        del self.levels[level + 1 :]
+
+    def append(self, data: bytes) -> None:
+        self.extend([data])
+
+    def extend(self, items: Iterable[bytes]) -> None:
+        items = list(items)
+        if not items:
+            return
+        first = len(self)
+        self.levels[0] += self._hash_leaves(items)
+        self._rebuild(first, len(self) - 1)
+
+    def __setitem__(self, index: int, data: bytes) -> None:
+        # Only the path from the leaf to the root is recomputed
+        assert 0 <= index < len(self), "Leaf index out of range"
+        d = self.len_digest
+        self.levels[0][index * d : (index + 1) * d] = _hash_leaves(
+            self.base, self.leaf_prefix, [data]
+        )
+        self._rebuild(index, index)
+
+    def root(self) -> bytes:
+        assert len(self), "The tree is empty"
+        return self._node(len(self.levels) - 1, 0)
+
+    def proof(self, index: int) -> Proof:
+        # (whether the sibling is on the left, sibling) from the leaf up
+        assert 0 <= index < len(self), "Leaf index out of range"
+        d = self.len_digest
+        path = []
+        for level, nodes in enumerate(self.levels[:-1]):
+            sibling = index ^ 1
+            if sibling < len(nodes) // d:
+                path.append((sibling < index, self._node(level, sibling)))
+            index //= 2
+        return path
+
+    def verify(self, data: bytes, proof: Proof, root: bytes = None) -> bool:
+        return self.verify_many([(data, proof)], root)[0]
+
+    def verify_many(
+        self, items: Iterable[tuple[bytes, Proof]], root: bytes = None
+    ) -> list[bool]:
+        # Proofs from one tree share the nodes near the root, so every
+        # distinct pair of children is hashed only once
+        root = self.root() if root is None else root
+        items = list(items)
+        leaves = _hash_leaves(self.base, self.leaf_prefix, [data for data, _ in items])
+        d = self.len_digest
+
+        parents = {}
+        results = []
+        for i, (_, proof) in enumerate(items):
+            node = leaves[i * d : (i + 1) * d]
+            for left, sibling in proof:
+                pair = sibling + node if left else node + sibling
+                parent = parents.get(pair)
+                if parent is None:
+                    parent = parents[pair] = self._hash_node(pair[:d], pair[d:])
+                node = parent
+            results.append(compare_digest(node, root))
+        return results
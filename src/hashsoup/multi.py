@@ -0,0 +1,75 @@
+from __future__ import annotations
+from typing import Iterable, Union
+
+from .hasher import Hasher
+
+# Inputs at least this long are split across processes when workers > 1
+PARALLEL_MIN = 1 << 20
+
+
+def _absorb(hasher: Hasher, data: bytes) -> Hasher:
+    hasher.update(data)
+    return hasher
+
+
+class MultiHasher:
+    def __init__(
+        self,
+        algorithms: Iterable[Union[type[Hasher], Hasher]],
+        inp: bytes = None,
+        workers: int = None,
+    ):
+        # Algorithms are classes or instances, which are copied
+        self.hashers = [a.copy() if isinstance(a, Hasher) else a() for a in algorithms]
+        names = [type(hasher).__name__ for hasher in self.hashers]
+        assert len(set(names)) == len(names), "Every algorithm must be different"
+        self.workers = workers
+        if inp is not None:
+            self.update(inp)
+
+    def update(self, inp: bytes) -> None:
+        # Every hasher walks the same memoryview, nothing is copied
+        data = memoryview(inp).cast("B")
+        if (self.workers or 1) > 1 and len(data) >= PARALLEL_MIN:
+            self._update_parallel(data)
+            return
+        for hasher in self.hashers:
+            hasher.update(data)
+
+    def _update_parallel(self, data: memoryview) -> None:
+        # Only pure-Python engines are worth a process, hashlib and libcrypto
+        # ones stay
+        remote = [
+            i for i, hasher in enumerate(self.hashers) if hasher._compresses_in_python()
+        ]
+        if len(remote) < 2:
+            for hasher in self.hashers:
+                hasher.update(data)
+            return
+
+        from .files import _get_pool
+
+        pool = _get_pool(self.workers, [self.hashers[i] for i in remote])
+        chunk = bytes(data)
+        futures = {i: pool.submit(_absorb, self.hashers[i], chunk) for i in remote[1:]}
+        # The first one runs here while the others are busy
+        for i, hasher in enumerate(self.hashers):
+            if i not in futures:
+                hasher.update(data)
+        for i, future in futures.items():
+            hasher = future.result()
+            hasher.backend = self.hashers[i].backend
+            hasher._native = False
+            self.hashers[i] = hasher
+
+    def copy(self) -> MultiHasher:
+        other = self.__class__.__new__(self.__class__)
+        other.__dict__.update(self.__dict__)
+        other.hashers = [hasher.copy() for hasher in self.hashers]
+        return other
+
+    def digests(self) -> dict[str, bytes]:
+        return {type(hasher).__name__: hasher.digest() for hasher in self.hashers}
+
+    def hexdigests(self) -> dict[str, str]:
+        return {name: digest.hex() for name, digest in self.digests().items()}
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import os
+from struct import Struct
+from typing import Callable, Optional
+
+# Runs whole blocks through the system libcrypto's low-level *_Update
+# functions, which take a caller-owned *_CTX whose leading fields are the
+# chaining state. Unlike hashlib this accepts any injected state. Every CTX
+# starts with its state words, and `num` stays 0 as only whole blocks are
+# passed, so the rest of the struct never matters.
+
+LEN_CTX = 256
+# Bytes copied into a ctypes buffer per call when the input is read-only
+LEN_SLICE = 1 << 20
+
+_lib = None
+_functions: dict[str, Optional[Callable]] = {}
+_structs: dict[str, Struct] = {}
+
+
+def _load():
+    global _lib
+    if _lib is None:
+        path = os.environ.get("HASHSOUP_LIBCRYPTO")
+        path = path or ctypes.util.find_library("crypto")
+        try:
+            _lib = ctypes.CDLL(path) if path else False
+        except OSError:
+            _lib = False
+    return _lib
+
+
+def function(name: str) -> Optional[Callable]:
+    # None when libcrypto or the symbol is missing
+    if name not in _functions:
+        lib = _load()
+        update = getattr(lib, name, None) if lib else None
+        if update is not None:
+            update.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+            update.restype = ctypes.c_int
+        _functions[name] = update
+    return _functions[name]
+
+
+def available(hasher) -> bool:
+    return hasher.LIBCRYPTO is not None and function(hasher.LIBCRYPTO[0]) is not None
+
+
+def blocks_updater(hasher) -> Optional[Callable]:
+    # libcrypto only knows the standard constants
+    if not available(hasher) or not hasher._default_constants():
+        return None
+
+    name, word = hasher.LIBCRYPTO
+    update = function(name)
+    fmt = f"={len(hasher.state)}{word}"
+    state = _structs.get(fmt)
+    if state is None:
+        state = _structs[fmt] = Struct(fmt)
+    ctx = ctypes.create_string_buffer(LEN_CTX)
+
+    def update_blocks(data):
+        state.pack_into(ctx, 0, *hasher.state)
+        with memoryview(data) as view:
+            if view.readonly:
+                for i in range(0, len(view), LEN_SLICE):
+                    chunk = bytes(view[i : i + LEN_SLICE])
+                    update(ctx, chunk, len(chunk))
+            else:
+                buffer = (ctypes.c_char * len(view)).from_buffer(view)
+                update(ctx, buffer, len(view))
+                del buffer
+        hasher.state = list(state.unpack_from(ctx))
+
+    return update_blocks
@@ -0,0 +1,38 @@
+from __future__ import annotations
+from importlib import import_module
+
+# Algorithm name -> module defining it, imported on first use
+ALGORITHMS = {
+    "MD2": "md2",
+    "MD4": "md4",
+    "MD5": "md5",
+    "SHA1": "sha1",
+    "SHA224": "sha224",
+    "SHA256": "sha256",
+    "SHA384": "sha384",
+    "SHA512": "sha512",
+    "RIPEMD128": "ripemd128",
+    "RIPEMD160": "ripemd160",
+    "SHA3_224": "keccak",
+    "SHA3_256": "keccak",
+    "SHA3_384": "keccak",
+    "SHA3_512": "keccak",
+    "SHAKE_128": "keccak",
+    "SHAKE_256": "keccak",
+}
+
+
+def get(name: str) -> type:
+    assert name in ALGORITHMS, f"Unknown algorithm {name}"
+    return getattr(import_module(f".{ALGORITHMS[name]}", __package__), name)
+
+
+# Lowercase names, as in hashlib.algorithms_available
+algorithms_available = {name.lower() for name in ALGORITHMS}
+
+
+def new(name: str, data: bytes = b"", state: bytes = None, digested: int = None):
+    # Like hashlib.new(), with the chaining state and length of a hasher to
+    # resume from, e.g. for length extension
+    cls = get(name.upper())
+    return cls(inp=data, state=state, digested=digested)
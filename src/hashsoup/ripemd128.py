@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, rol32_src
 from .hasher import Hasher
 from .utils import rol32
 
@@ -51,6 +52,7 @@ class RIPEMD128(Hasher):
 
     LEN_STATE = 16
     LEN_BLOCK = 64
+    BLOCK_FORMAT = "<16I"
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -74,7 +76,7 @@ class RIPEMD128(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -84,19 +86,6 @@ class RIPEMD128(Hasher):
         padding += (len_ * 8).to_bytes(8, "little")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         M = [int.from_bytes(chunk[i : i + 4], "little") for i in range(0, 64, 4)]
 
@@ -139,11 +128,60 @@ class RIPEMD128(Hasher):
             (self.state[0] + B + CC) & 0xFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3 = A, B, C, D = AA, BB, CC, DD = H"]
+        lines.append(", ".join(f"M{i}" for i in range(16)) + " = M")
+
+        # Round 1-4
+        A, B, C, D = "A", "B", "C", "D"
+        for i in range(64):
+            if i < 16:
+                F = f"{B} ^ {C} ^ {D}"
+            elif i < 32:
+                F = f"({B} & {C}) | (~{B} & {D})"
+            elif i < 48:
+                F = f"({B} | ~{C}) ^ {D}"
+            else:
+                F = f"({B} & {D}) | ({C} & ~{D})"
+
+            K = self.C1[i // 16]
+            lines.append(f"{A} = (({F}) + {A} + M{self.g1[i]} + {K:#x}) & 0xFFFFFFFF")
+            lines.append(f"{A} = {rol32_src(A, self.s1[i])}")
+            A, B, C, D = D, A, B, C
+
+        # Parallel round 1-4
+        AA, BB, CC, DD = "AA", "BB", "CC", "DD"
+        for i in range(64):
+            if i < 16:
+                F = f"({BB} & {DD}) | ({CC} & ~{DD})"
+            elif i < 32:
+                F = f"({BB} | ~{CC}) ^ {DD}"
+            elif i < 48:
+                F = f"({BB} & {CC}) | (~{BB} & {DD})"
+            else:
+                F = f"{BB} ^ {CC} ^ {DD}"
+
+            K = self.C2[i // 16]
+            lines.append(f"{AA} = (({F}) + {AA} + M{self.g2[i]} + {K:#x}) & 0xFFFFFFFF")
+            lines.append(f"{AA} = {rol32_src(AA, self.s2[i])}")
+            AA, BB, CC, DD = DD, AA, BB, CC
+
+        lines.append(
+            f"return [(H1 + {C} + {DD}) & 0xFFFFFFFF, (H2 + {D} + {AA}) & 0xFFFFFFFF,"
+            f" (H3 + {A} + {BB}) & 0xFFFFFFFF, (H0 + {B} + {CC}) & 0xFFFFFFFF]"
+        )
+        return lines
+
+    def _compressor(self):
+        constants = [self.s1, self.s2, self.g1, self.g2, self.C1, self.C2]
+        return compressor(self, constants, self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
 
-        assert len(copy.buffer) == 0
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
 
-        return b"".join(v.to_bytes(4, "little") for v in copy.state)
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
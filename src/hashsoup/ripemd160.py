@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, rol32_src
 from .hasher import Hasher
 from .utils import rol32
 
@@ -54,6 +55,9 @@ class RIPEMD160(Hasher):
 
     LEN_STATE = 20
     LEN_BLOCK = 64
+    BLOCK_FORMAT = "<16I"
+    HASHLIB_NAME = "ripemd160"
+    LIBCRYPTO = ("RIPEMD160_Update", "I")
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -77,7 +81,7 @@ class RIPEMD160(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -87,19 +91,6 @@ class RIPEMD160(Hasher):
         padding += (len_ * 8).to_bytes(8, "little")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         M = [int.from_bytes(chunk[i : i + 4], "little") for i in range(0, 64, 4)]
 
@@ -149,11 +140,67 @@ class RIPEMD160(Hasher):
             (self.state[0] + B + CC) & 0xFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3, H4 = A, B, C, D, E = AA, BB, CC, DD, EE = H"]
+        lines.append(", ".join(f"M{i}" for i in range(16)) + " = M")
+
+        # Round 1-5
+        A, B, C, D, E = "A", "B", "C", "D", "E"
+        for i in range(80):
+            if i < 16:
+                F = f"{B} ^ {C} ^ {D}"
+            elif i < 32:
+                F = f"({B} & {C}) | (~{B} & {D})"
+            elif i < 48:
+                F = f"({B} | ~{C}) ^ {D}"
+            elif i < 64:
+                F = f"({B} & {D}) | ({C} & ~{D})"
+            else:
+                F = f"{B} ^ ({C} | ~{D})"
+
+            K = self.C1[i // 16]
+            lines.append(f"{A} = (({F}) + {A} + M{self.g1[i]} + {K:#x}) & 0xFFFFFFFF")
+            lines.append(f"{A} = ({rol32_src(A, self.s1[i])} + {E}) & 0xFFFFFFFF")
+            lines.append(f"{C} = {rol32_src(C, 10)}")
+            A, B, C, D, E = E, A, B, C, D
+
+        # Parallel round 1-5
+        AA, BB, CC, DD, EE = "AA", "BB", "CC", "DD", "EE"
+        for i in range(80):
+            if i < 16:
+                F = f"{BB} ^ ({CC} | ~{DD})"
+            elif i < 32:
+                F = f"({BB} & {DD}) | ({CC} & ~{DD})"
+            elif i < 48:
+                F = f"({BB} | ~{CC}) ^ {DD}"
+            elif i < 64:
+                F = f"({BB} & {CC}) | (~{BB} & {DD})"
+            else:
+                F = f"{BB} ^ {CC} ^ {DD}"
+
+            K = self.C2[i // 16]
+            lines.append(f"{AA} = (({F}) + {AA} + M{self.g2[i]} + {K:#x}) & 0xFFFFFFFF")
+            lines.append(f"{AA} = ({rol32_src(AA, self.s2[i])} + {EE}) & 0xFFFFFFFF")
+            lines.append(f"{CC} = {rol32_src(CC, 10)}")
+            AA, BB, CC, DD, EE = EE, AA, BB, CC, DD
+
+        lines.append(
+            f"return [(H1 + {C} + {DD}) & 0xFFFFFFFF, (H2 + {D} + {EE}) & 0xFFFFFFFF,"
+            f" (H3 + {E} + {AA}) & 0xFFFFFFFF, (H4 + {A} + {BB}) & 0xFFFFFFFF,"
+            f" (H0 + {B} + {CC}) & 0xFFFFFFFF]"
+        )
+        return lines
+
+    def _compressor(self):
+        constants = [self.s1, self.s2, self.g1, self.g2, self.C1, self.C2]
+        return compressor(self, constants, self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
 
-        assert len(copy.buffer) == 0
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
 
-        return b"".join(v.to_bytes(4, "little") for v in copy.state)
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(4, "little") for v in self.state)
@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, rol32_src
 from .hasher import Hasher
 from .utils import rol32
 
@@ -17,6 +18,9 @@ class SHA1(Hasher):
 
     LEN_STATE = 20
     LEN_BLOCK = 64
+    BLOCK_FORMAT = ">16I"
+    HASHLIB_NAME = "sha1"
+    LIBCRYPTO = ("SHA1_Update", "I")
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -37,7 +41,7 @@ class SHA1(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -47,19 +51,6 @@ class SHA1(Hasher):
         padding += (len_ * 8).to_bytes(8, "big")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         w = [int.from_bytes(chunk[i : i + 4], "big") for i in range(0, 64, 4)]
         a, b, c, d, e = self.state
@@ -88,11 +79,48 @@ class SHA1(Hasher):
             (self.state[4] + e) & 0xFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3, H4 = a, b, c, d, e = H"]
+        lines.append(", ".join(f"w{i}" for i in range(16)) + " = M")
+
+        for i in range(16, 80):
+            lines.append(f"w{i} = w{i - 3} ^ w{i - 8} ^ w{i - 14} ^ w{i - 16}")
+            lines.append(f"w{i} = {rol32_src(f'w{i}', 1)}")
+
+        a, b, c, d, e = "a", "b", "c", "d", "e"
+        for i in range(80):
+            if i < 20:
+                f = f"({b} & {c}) ^ (~{b} & {d})"
+            elif i < 40:
+                f = f"{b} ^ {c} ^ {d}"
+            elif i < 60:
+                f = f"({b} & {c}) ^ ({b} & {d}) ^ ({c} & {d})"
+            else:
+                f = f"{b} ^ {c} ^ {d}"
+
+            K = self.K[i // 20]
+            lines.append(
+                f"{e} = ({rol32_src(a, 5)} + ({f}) + {e} + {K:#x} + w{i}) & 0xFFFFFFFF"
+            )
+            lines.append(f"{b} = {rol32_src(b, 30)}")
+            a, b, c, d, e = e, a, b, c, d
+
+        lines.append(
+            f"return [(H0 + {a}) & 0xFFFFFFFF, (H1 + {b}) & 0xFFFFFFFF,"
+            f" (H2 + {c}) & 0xFFFFFFFF, (H3 + {d}) & 0xFFFFFFFF,"
+            f" (H4 + {e}) & 0xFFFFFFFF]"
+        )
+        return lines
+
+    def _compressor(self):
+        return compressor(self, [self.K], self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
 
-        assert len(copy.buffer) == 0
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(4, "big") for v in self.state)
 
-        return b"".join(v.to_bytes(4, "big") for v in copy.state)
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(4, "big") for v in self.state)
@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, ror32_src
 from .hasher import Hasher
 from .utils import ror32
 
@@ -34,6 +35,9 @@ class SHA256(Hasher):
 
     LEN_STATE = 32
     LEN_BLOCK = 64
+    BLOCK_FORMAT = ">16I"
+    HASHLIB_NAME = "sha256"
+    LIBCRYPTO = ("SHA256_Update", "I")
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -54,7 +58,7 @@ class SHA256(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -64,19 +68,6 @@ class SHA256(Hasher):
         padding += (len_ * 8).to_bytes(8, "big")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         w = [
             int.from_bytes(chunk[i : i + 4], "big") for i in range(0, self.LEN_BLOCK, 4)
@@ -110,11 +101,45 @@ class SHA256(Hasher):
             (self.state[7] + h) & 0xFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3, H4, H5, H6, H7 = a, b, c, d, e, f, g, h = H"]
+        lines.append(", ".join(f"w{i}" for i in range(16)) + " = M")
+
+        for i in range(16, 64):
+            x, y = f"w{i - 15}", f"w{i - 2}"
+            s0 = f"{ror32_src(x, 7)} ^ {ror32_src(x, 18)} ^ ({x} >> 3)"
+            s1 = f"{ror32_src(y, 17)} ^ {ror32_src(y, 19)} ^ ({y} >> 10)"
+            lines.append(
+                f"w{i} = (w{i - 16} + ({s0}) + w{i - 7} + ({s1})) & 0xFFFFFFFF"
+            )
+
+        a, b, c, d, e, f, g, h = "a", "b", "c", "d", "e", "f", "g", "h"
+        for i in range(64):
+            S1 = f"{ror32_src(e, 6)} ^ {ror32_src(e, 11)} ^ {ror32_src(e, 25)}"
+            ch = f"({e} & {f}) ^ (~{e} & {g})"
+            S0 = f"{ror32_src(a, 2)} ^ {ror32_src(a, 13)} ^ {ror32_src(a, 22)}"
+            maj = f"({a} & {b}) ^ ({a} & {c}) ^ ({b} & {c})"
+
+            lines.append(f"t = {h} + ({S1}) + ({ch}) + {self.k[i]:#x} + w{i}")
+            lines.append(f"{d} = ({d} + t) & 0xFFFFFFFF")
+            lines.append(f"{h} = (t + ({S0}) + ({maj})) & 0xFFFFFFFF")
+            a, b, c, d, e, f, g, h = h, a, b, c, d, e, f, g
+
+        state = ", ".join(
+            f"(H{i} + {v}) & 0xFFFFFFFF" for i, v in enumerate([a, b, c, d, e, f, g, h])
+        )
+        lines.append(f"return [{state}]")
+        return lines
+
+    def _compressor(self):
+        return compressor(self, [self.k], self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
 
-        assert len(copy.buffer) == 0
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(4, "big") for v in self.state)
 
-        return b"".join(v.to_bytes(4, "big") for v in copy.state)
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(4, "big") for v in self.state)
@@ -1,5 +1,6 @@
-from copy import deepcopy
+from __future__ import annotations
 
+from .codegen import chunk_updater, compressor, ror64_src
 from .hasher import Hasher
 from .utils import ror64
 
@@ -34,6 +35,9 @@ class SHA512(Hasher):
 
     LEN_STATE = 64
     LEN_BLOCK = 128
+    BLOCK_FORMAT = ">16Q"
+    HASHLIB_NAME = "sha512"
+    LIBCRYPTO = ("SHA512_Update", "Q")
     # fmt: on
 
     def __init__(self, inp: bytes = None, state: bytes = None, digested: int = None):
@@ -54,7 +58,7 @@ class SHA512(Hasher):
         # Store byte length
         self.digested = digested or 0
 
-        if inp:
+        if inp is not None:
             self.update(inp)
 
     @classmethod
@@ -64,19 +68,6 @@ class SHA512(Hasher):
         padding += (len_ * 8).to_bytes(16, "big")
         return padding
 
-    def _pad(self):
-        self.buffer += self.get_padding(self.digested)
-
-    def update(self, inp: bytes) -> None:
-        self.buffer += inp
-        self.digested += len(inp)
-        self._update()
-
-    def _update(self):
-        while len(self.buffer) >= self.LEN_BLOCK:
-            self._update_chunk(self.buffer[: self.LEN_BLOCK])
-            self.buffer = self.buffer[self.LEN_BLOCK :]
-
     def _update_chunk(self, chunk: bytes):
         w = [
             int.from_bytes(chunk[i : i + 8], "big") for i in range(0, self.LEN_BLOCK, 8)
@@ -112,11 +103,46 @@ class SHA512(Hasher):
             (self.state[7] + h) & 0xFFFFFFFFFFFFFFFF,
         ]
 
-    def digest(self) -> bytes:
-        copy = deepcopy(self)
-        copy._pad()
-        copy._update()
+    def _source(self) -> list[str]:
+        # Round-unrolled `_update_chunk`, variables are renamed instead of rotated
+        lines = ["H0, H1, H2, H3, H4, H5, H6, H7 = a, b, c, d, e, f, g, h = H"]
+        lines.append(", ".join(f"w{i}" for i in range(16)) + " = M")
 
-        assert len(copy.buffer) == 0
-
-        return b"".join(v.to_bytes(8, "big") for v in copy.state)
+        for i in range(16, 80):
+            x, y = f"w{i - 15}", f"w{i - 2}"
+            s0 = f"{ror64_src(x, 1)} ^ {ror64_src(x, 8)} ^ ({x} >> 7)"
+            s1 = f"{ror64_src(y, 19)} ^ {ror64_src(y, 61)} ^ ({y} >> 6)"
+            lines.append(
+                f"w{i} = (w{i - 16} + ({s0}) + w{i - 7} + ({s1})) & 0xFFFFFFFFFFFFFFFF"
+            )
+
+        a, b, c, d, e, f, g, h = "a", "b", "c", "d", "e", "f", "g", "h"
+        for i in range(80):
+            S1 = f"{ror64_src(e, 14)} ^ {ror64_src(e, 18)} ^ {ror64_src(e, 41)}"
+            ch = f"({e} & {f}) ^ (~{e} & {g})"
+            S0 = f"{ror64_src(a, 28)} ^ {ror64_src(a, 34)} ^ {ror64_src(a, 39)}"
+            maj = f"({a} & {b}) ^ ({a} & {c}) ^ ({b} & {c})"
+
+            lines.append(f"t = {h} + ({S1}) + ({ch}) + {self.k[i]:#x} + w{i}")
+            lines.append(f"{d} = ({d} + t) & 0xFFFFFFFFFFFFFFFF")
+            lines.append(f"{h} = (t + ({S0}) + ({maj})) & 0xFFFFFFFFFFFFFFFF")
+            a, b, c, d, e, f, g, h = h, a, b, c, d, e, f, g
+
+        state = ", ".join(
+            f"(H{i} + {v}) & 0xFFFFFFFFFFFFFFFF"
+            for i, v in enumerate([a, b, c, d, e, f, g, h])
+        )
+        lines.append(f"return [{state}]")
+        return lines
+
+    def _compressor(self):
+        return compressor(self, [self.k], self._source)
+
+    def _chunk_updater(self):
+        return chunk_updater(self, self.BLOCK_FORMAT)
+
+    def _output(self) -> bytes:
+        return b"".join(v.to_bytes(8, "big") for v in self.state)
+
+    def _state_bytes(self) -> bytes:
+        return b"".join(v.to_bytes(8, "big") for v in self.state)
@@ -0,0 +1,11 @@
+import os
+import tempfile
+
+from hashsoup import hasher
+
+# The suite checks the pure-Python engines, test_backend.py covers hashlib
+hasher.set_backend("python")
+
+# Compiled compression functions are cached away from the user's cache
+_cache_dir = tempfile.TemporaryDirectory(prefix="hashsoup-test-")
+os.environ["HASHSOUP_CACHE_DIR"] = _cache_dir.name
@@ -0,0 +1,89 @@
+import asyncio
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from hashsoup import *
+from hashsoup import aio, native
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+class ChunkReader:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def read(self, n: int) -> bytes:
+        chunk, self.data = self.data[:n], self.data[n:]
+        await asyncio.sleep(0)
+        return chunk
+
+
+class TestAio:
+    def test_update_async(self):
+        rng = random.Random(b"test_seed")
+        targets = [randbytes(rng, 0x1000 + i) for i in range(4)]
+
+        async def feed(hasher, target):
+            for i in range(0, len(target), 0x99):
+                await hasher.update_async(target[i : i + 0x99], batch_size=0x200)
+            return await hasher.digest_async()
+
+        async def main():
+            hashers = [SHA256(), MD5(), SHA3_256(), SHA1()]
+            return await asyncio.gather(*map(feed, hashers, targets))
+
+        digests = asyncio.run(main())
+        algorithms = [SHA256, MD5, SHA3_256, SHA1]
+        assert digests == [a(t).digest() for a, t in zip(algorithms, targets)]
+
+    def test_hash_stream(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x3000)
+
+        async def main(executor):
+            reader = asyncio.StreamReader()
+            reader.feed_data(target)
+            reader.feed_eof()
+            first = await aio.hash_stream(reader, SHA256, executor, 0x1000)
+            second = await aio.hash_stream(ChunkReader(target), MD4(), executor)
+            return first.digest(), second.digest()
+
+        expected = (SHA256(target).digest(), MD4(target).digest())
+        assert asyncio.run(main(None)) == expected
+        with ThreadPoolExecutor(2) as executor:
+            assert asyncio.run(main(executor)) == expected
+        with ProcessPoolExecutor(2) as executor:
+            assert asyncio.run(main(executor)) == expected
+
+    def test_flush(self):
+        async def main():
+            hasher = SHA1()
+            await hasher.update_async(b"abc")
+            before = hasher.digested
+            await hasher.flush_async()
+            return before, hasher
+
+        before, hasher = asyncio.run(main())
+        assert before == 0
+        assert hasher.digest() == SHA1(b"abc").digest()
+
+    def test_process_selection(self, monkeypatch):
+        # Hashers that do not compress in Python are updated in a thread
+        calls = []
+        monkeypatch.setattr(aio, "_absorb", lambda *args: calls.append(args))
+
+        async def main(executor):
+            hasher = SHA256()
+            hasher.backend = "auto"
+            await hasher.update_async(b"abc" * 1000, executor, batch_size=1)
+            return await hasher.digest_async(executor)
+
+        if not native.available(SHA256()):
+            return
+        with ProcessPoolExecutor(1) as executor:
+            assert asyncio.run(main(executor)) == SHA256(b"abc" * 1000).digest()
+        assert calls == []
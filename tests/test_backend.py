@@ -0,0 +1,144 @@
+import copy
+import hashlib
+import pickle
+import random
+
+import pytest
+
+from hashsoup import *
+from hashsoup import hasher as hasher_module
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [
+    MD4,
+    MD5,
+    SHA1,
+    SHA224,
+    SHA256,
+    SHA384,
+    SHA512,
+    RIPEMD160,
+    SHA3_224,
+    SHA3_256,
+    SHA3_384,
+    SHA3_512,
+    lambda inp=None: SHAKE_128(256, inp),
+    lambda inp=None: SHAKE_256(512, inp),
+]
+
+
+@pytest.fixture
+def auto():
+    hasher_module.set_backend("auto")
+    yield
+    hasher_module.set_backend("python")
+
+
+@pytest.fixture
+def handoff():
+    hasher_module.set_backend("hashlib")
+    yield
+    hasher_module.set_backend("python")
+
+
+def native(hasher):
+    return bool(hasher.__dict__.get("_native"))
+
+
+class TestBackend:
+    def test_identical(self, handoff):
+        rng = random.Random(b"test_seed")
+        prefix, suffix = randbytes(rng, 0x123), randbytes(rng, 0x45)
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(prefix)
+            if not native(hasher):
+                continue  # Not in this build of hashlib
+            copy = hasher.copy()
+            copy.update(suffix)
+
+            python = algorithm()
+            python.backend = "python"
+            python.update(prefix)
+            assert not native(python)
+            assert hasher.digest() == python.digest()
+            python.update(suffix)
+            assert copy.digest() == python.digest()
+
+    def test_auto_keeps_state(self, auto):
+        for algorithm in ALGORITHMS + [MD2, RIPEMD128]:
+            assert not native(algorithm(b"abc"))
+
+    def test_fallback(self, handoff):
+        assert not native(MD2(b"abc"))
+        hasher = SHA256(b"abc", state=bytes(32), digested=64)
+        assert not native(hasher)
+        assert len(hasher.state) == 8
+
+        hasher = SHA256()
+        hasher.k[0] ^= 1
+        hasher.update(b"abc")
+        assert not native(hasher)
+        assert hasher.digest() != SHA256(b"abc").digest()
+
+    def test_state_unavailable(self, handoff):
+        hasher = SHA256(b"abc")
+        assert native(hasher)
+        with pytest.raises(AttributeError, match="runs on hashlib"):
+            hasher.state
+        with pytest.raises(AttributeError, match="no attribute"):
+            hasher.missing
+
+    def test_constants_modified_later(self, handoff):
+        hasher = SHA1(b"abc")
+        hasher.K[0] ^= 1
+        with pytest.raises(AssertionError):
+            hasher.digest()
+
+    def test_shake_length(self, handoff):
+        hasher = SHAKE_256(inp=b"abc")
+        python = SHAKE_256()
+        python.backend = "python"
+        python.update(b"abc")
+        assert hasher.digest(1000) == python.digest(1000)
+
+    def test_hashlib_unless_forced(self):
+        assert native(SHA256(b"abc")) is False
+        hasher_module.set_backend("hashlib")
+        try:
+            assert native(SHA256(b"abc"))
+        finally:
+            hasher_module.set_backend("python")
+
+
+class TestAuto:
+    def test_state(self, auto):
+        hasher = SHA256(b"abc" * 100)
+        assert len(hasher.state) == 8 and len(hasher.buffer) == 300 % 64
+        assert hasher.digest() == hashlib.sha256(b"abc" * 100).digest()
+
+    def test_serialize(self, auto):
+        for algorithm in [SHA256, SHA512, MD5, SHA3_256]:
+            hasher = algorithm(b"prefix" * 50)
+            for other in [
+                pickle.loads(pickle.dumps(hasher)),
+                copy.deepcopy(hasher),
+                algorithm.from_bytes(hasher.to_bytes()),
+            ]:
+                other.update(b"tail")
+                assert other.digest() == algorithm(b"prefix" * 50 + b"tail").digest()
+
+    def test_reader(self, auto):
+        reader = SHAKE_128(inp=b"abc").reader()
+        assert reader.read(100) == hashlib.shake_128(b"abc").digest(100)
+
+    def test_hash_files(self, auto, tmp_path):
+        path = tmp_path / "a"
+        path.write_bytes(b"data")
+        [result] = hash_files([path], [SHA256(b"prefix")], workers=1)
+        assert result.digests == [hashlib.sha256(b"prefixdata").digest()]
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from hashsoup import *
+
+np = pytest.importorskip("numpy")
+from hashsoup.batch import hash_many
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [
+    MD4,
+    MD5,
+    SHA1,
+    SHA224,
+    SHA256,
+    SHA384,
+    SHA512,
+    RIPEMD128,
+    RIPEMD160,
+]
+
+
+class TestHashMany:
+    def test_variable_length(self):
+        rng = random.Random(b"test_seed")
+        messages = [randbytes(rng, rng.randrange(0, 300)) for _ in range(100)]
+        for algorithm in ALGORITHMS:
+            out = hash_many(algorithm, messages)
+            assert out.dtype == np.uint8
+            assert out.shape == (len(messages), len(algorithm().digest()))
+            for i, message in enumerate(messages):
+                assert out[i].tobytes() == algorithm(message).digest()
+
+    def test_empty(self):
+        for algorithm in ALGORITHMS:
+            out = hash_many(algorithm, [b""])
+            assert out[0].tobytes() == algorithm(b"").digest()
+
+    def test_state(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            messages = [randbytes(rng, rng.randrange(0, 200)) for _ in range(20)]
+            states = [randbytes(rng, algorithm.LEN_STATE) for _ in messages]
+            states[0] = None
+            digested = [rng.randrange(0, 10) * algorithm.LEN_BLOCK for _ in messages]
+            out = hash_many(algorithm, messages, states, digested)
+            for i, message in enumerate(messages):
+                expected = algorithm(message, states[i], digested[i]).digest()
+                assert out[i].tobytes() == expected
+
+    def test_prototype(self):
+        hasher = MD5()
+        hasher.K[0] ^= 1
+        messages = [b"", b"abc", b"a" * 100]
+        out = hash_many(hasher, messages)
+        for i, message in enumerate(messages):
+            copy = hasher.copy()
+            copy.update(message)
+            assert out[i].tobytes() == copy.digest()
+
+    def test_keccak(self):
+        rng = random.Random(b"test_seed")
+        messages = [randbytes(rng, rng.randrange(0, 400)) for _ in range(50)]
+        for algorithm in [SHA3_224, SHA3_256, SHA3_384, SHA3_512]:
+            out = hash_many(algorithm, messages)
+            for i, message in enumerate(messages):
+                assert out[i].tobytes() == algorithm(message).digest()
+
+        for algorithm in [SHAKE_128, SHAKE_256]:
+            out = hash_many(algorithm(2048), messages)
+            assert out.shape == (len(messages), 256)
+            for i, message in enumerate(messages):
+                assert out[i].tobytes() == algorithm(2048, message).digest()
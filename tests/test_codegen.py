@@ -0,0 +1,112 @@
+import os
+import random
+import subprocess
+import sys
+
+from hashsoup import *
+from hashsoup import codegen
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+ALGORITHMS = [MD4, MD5, SHA1, SHA224, SHA256, SHA384, SHA512, RIPEMD128, RIPEMD160]
+
+
+def reference(hasher, data):
+    # Feed whole blocks through the loop-based `_update_chunk`
+    for i in range(0, len(data), hasher.LEN_BLOCK):
+        hasher._update_chunk(data[i : i + hasher.LEN_BLOCK])
+    return hasher.state
+
+
+class TestCodegen:
+    def test_default(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            data = randbytes(rng, algorithm.LEN_BLOCK * 3)
+            hasher = algorithm()
+            hasher.update(data)
+            assert hasher.state == reference(
+                algorithm(), data
+            ), f"Failed with {algorithm}"
+
+    def test_modified_constants(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            data = randbytes(rng, algorithm.LEN_BLOCK * 2)
+            hasher, expected = algorithm(), algorithm()
+            for h in (hasher, expected):
+                for name, value in vars(h).items():
+                    if isinstance(value, list) and name != "state":
+                        value[1], value[2] = value[2], value[1]
+            hasher.update(data)
+            assert hasher.state == reference(expected, data), f"Failed with {algorithm}"
+
+    def test_constants_changed_later(self):
+        rng = random.Random(b"test_seed")
+        data = randbytes(rng, MD5.LEN_BLOCK * 2)
+        hasher, expected = MD5(), MD5()
+        hasher.update(data[:64])
+        reference(expected, data[:64])
+        hasher.K[0] = expected.K[0] = 0x12345678
+        hasher.update(data[64:])
+        assert hasher.state == reference(expected, data[64:])
+
+    def test_keccak(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in [SHA3_224, SHA3_256, SHA3_384, SHA3_512]:
+            data = randbytes(rng, algorithm.LEN_BLOCK * 3)
+            hasher, expected = algorithm(), algorithm()
+            hasher.RC[3] = expected.RC[3] = 0x1234
+            hasher.update(data)
+            assert hasher.state == reference(expected, data), f"Failed with {algorithm}"
+
+    def test_disk_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HASHSOUP_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(codegen, "_compiled", {})
+        hasher = SHA256()
+        hasher.k[0] ^= 1
+        hasher.update(bytes(64))
+        assert len(os.listdir(tmp_path)) == 1
+
+        monkeypatch.setattr(codegen, "_compiled", {})
+        other = SHA256()
+        other.k[0] ^= 1
+        other.update(bytes(64))
+        assert other.state == hasher.state
+
+    def test_disk_cache_across_processes(self, tmp_path):
+        env = dict(os.environ, PYTHONPATH=SRC, HASHSOUP_CACHE_DIR=str(tmp_path))
+        script = (
+            "import sys\n"
+            "from hashsoup import SHA3_256, SHA256, codegen\n"
+            "if sys.argv[1] == 'reuse':\n"
+            "    codegen.compile = None\n"
+            "for algorithm in (SHA256, SHA3_256):\n"
+            "    hasher = algorithm()\n"
+            "    hasher.backend = 'python'\n"
+            "    hasher.update(bytes(200))\n"
+        )
+        run = [sys.executable, "-c", script]
+        subprocess.run(run + ["fill"], env=env, check=True)
+        files = sorted(os.listdir(tmp_path))
+        assert len(files) == 2
+        # Compiling again would fail in the second interpreter
+        subprocess.run(run + ["reuse"], env=env, check=True)
+        assert sorted(os.listdir(tmp_path)) == files
+
+    def test_prune(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HASHSOUP_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(codegen, "MAX_CACHE_FILES", 2)
+        monkeypatch.setattr(codegen, "_compiled", {})
+        for i in range(4):
+            hasher = SHA256()
+            hasher.k[0] = i
+            hasher.update(bytes(64))
+        assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+import pytest
+
+from hashsoup import *
+from hashsoup.discovery import candidate_algorithms
+
+SECRET = b"s3cr3t-key-0123456789"
+MESSAGE, SUFFIX = b"user=guest&role=user", b"&role=admin"
+
+
+def oracle(message, digest):
+    return hashlib.sha1(SECRET + message).digest() == digest
+
+
+class Interrupting:
+    def __init__(self, limit):
+        self.limit = limit
+        self.calls = []
+
+    def __call__(self, message, digest):
+        if len(self.calls) == self.limit:
+            raise KeyboardInterrupt
+        self.calls.append(message)
+        return oracle(message, digest)
+
+
+class TestDiscover:
+    def test_algorithms(self):
+        assert candidate_algorithms(bytes(16)) == [MD4, MD5, RIPEMD128]
+        assert candidate_algorithms(bytes(20)) == [SHA1, RIPEMD160]
+        assert candidate_algorithms(bytes(64)) == [SHA512]
+        with pytest.raises(AssertionError):
+            candidate_algorithms(bytes(28))
+
+    def test_discover(self):
+        known = hashlib.sha1(SECRET + MESSAGE).digest()
+        for workers in (1, 2):
+            found = discover(oracle, known, MESSAGE, SUFFIX, workers=workers)
+            assert found.algorithm == "SHA1"
+            assert found.secret_len == len(SECRET)
+            assert found.message.startswith(MESSAGE)
+            assert found.message.endswith(SUFFIX)
+            assert hashlib.sha1(SECRET + found.message).digest() == found.digest
+
+        assert discover(oracle, known, MESSAGE, SUFFIX, range(1, 10)) is None
+        md5 = hashlib.md5(SECRET + MESSAGE).digest()
+        assert discover(oracle, md5, MESSAGE, SUFFIX, range(1, 30)) is None
+
+    def test_resume(self, tmp_path):
+        checkpoint = str(tmp_path / "search.json")
+        known = hashlib.sha1(SECRET + MESSAGE).digest()
+
+        first = Interrupting(15)
+        with pytest.raises(KeyboardInterrupt):
+            discover(first, known, MESSAGE, SUFFIX, checkpoint=checkpoint)
+        with open(checkpoint) as f:
+            assert json.load(f)["next"] == 15
+
+        second = Interrupting(100)
+        found = discover(second, known, MESSAGE, SUFFIX, checkpoint=checkpoint)
+        assert found.secret_len == len(SECRET)
+        # SHA1 and RIPEMD160 are both tried at every length
+        assert len(first.calls) + len(second.calls) == 2 * (len(SECRET) - 1) + 1
+
+        with pytest.raises(AssertionError):
+            discover(oracle, known, MESSAGE, b"other", checkpoint=checkpoint)
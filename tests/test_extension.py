@@ -0,0 +1,42 @@
+import hashlib
+import random
+
+from hashsoup import *
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [MD4, MD5, SHA1, SHA256, SHA512, RIPEMD128, RIPEMD160]
+
+
+class TestExtend:
+    def test_hashlib(self):
+        rng = random.Random(b"test_seed")
+        secret = randbytes(rng, 23)
+        message, suffix = b"user=guest", b";admin=true"
+        for algorithm, name in [(MD5, "md5"), (SHA1, "sha1"), (SHA256, "sha256")]:
+            known = hashlib.new(name, secret + message).digest()
+            candidates = extend(algorithm, known, message, suffix, range(40))
+            forged, digest = candidates[len(secret)]
+            assert forged.endswith(suffix)
+            assert hashlib.new(name, secret + forged).digest() == digest
+
+    def test_every_length(self):
+        rng = random.Random(b"test_seed")
+        message, suffix = randbytes(rng, 70), randbytes(rng, 150)
+        for algorithm in ALGORITHMS:
+            for secret_len in range(0, 2 * algorithm.LEN_BLOCK, 13):
+                secret = randbytes(rng, secret_len)
+                known = algorithm(secret + message).digest()
+                candidates = extend(algorithm, known, message, suffix, [secret_len])
+                forged, digest = candidates[0]
+                assert algorithm(secret + forged).digest() == digest
+
+    def test_many(self):
+        candidates = extend(SHA256, bytes(32), b"msg", b"tail", range(5000))
+        assert len(candidates) == 5000
+        assert len({digest for _, digest in candidates}) == 5000 // 64 + 1
@@ -0,0 +1,138 @@
+import io
+import os
+import random
+import threading
+
+import pytest
+
+from hashsoup import *
+from hashsoup import files
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [
+    MD2,
+    MD4,
+    MD5,
+    SHA1,
+    SHA224,
+    SHA256,
+    SHA384,
+    SHA512,
+    RIPEMD128,
+    RIPEMD160,
+    SHA3_224,
+    SHA3_256,
+    SHA3_384,
+    SHA3_512,
+    lambda inp=None: SHAKE_128(256, inp),
+    lambda inp=None: SHAKE_256(512, inp),
+]
+
+
+class TestHashFiles:
+    def test_hash_files(self, tmp_path):
+        rng = random.Random(b"test_seed")
+        contents = {}
+        for i, len_ in enumerate([0, 1, 0x100, 0x1234, 0x40000]):
+            path = tmp_path / f"file{i}"
+            contents[str(path)] = randbytes(rng, len_)
+            path.write_bytes(contents[str(path)])
+
+        results = list(hash_files(contents, [MD5, SHA256], workers=2))
+        assert sorted(r.path for r in results) == sorted(contents)
+        for path, digests, error in results:
+            assert error is None
+            data = contents[path]
+            assert digests == [MD5(data).digest(), SHA256(data).digest()]
+
+    def test_errors(self, tmp_path):
+        path = tmp_path / "file"
+        path.write_bytes(b"abc")
+        missing = tmp_path / "missing"
+
+        results = {r.path: r for r in hash_files([missing, path], [SHA1], workers=2)}
+        assert isinstance(results[str(missing)].error, OSError)
+        assert results[str(missing)].digests is None
+        assert results[str(path)].digests == [SHA1(b"abc").digest()]
+
+    def test_instances(self, tmp_path):
+        path = tmp_path / "file"
+        path.write_bytes(b"suffix")
+        prefix = b"a" * SHA256.LEN_BLOCK
+        hasher = SHA256(state=SHA256(prefix)._state_bytes(), digested=len(prefix))
+        modified = MD5()
+        modified.K[0] ^= 1
+
+        ((_, digests, error),) = hash_files([path], [hasher, modified], workers=1)
+        assert error is None
+        assert digests[0] == SHA256(prefix + b"suffix").digest()
+        modified.update(b"suffix")
+        assert digests[1] == modified.digest()
+
+    def test_broken_pool(self, tmp_path):
+        path = tmp_path / "file"
+        path.write_bytes(b"abc")
+        pool = files._get_pool(2, [])
+        with pytest.raises(Exception):
+            pool.submit(os._exit, 1).result()
+
+        ((_, digests, error),) = hash_files([path], [SHA1], workers=2)
+        assert error is None
+        assert digests == [SHA1(b"abc").digest()]
+        assert files._pool is not pool
+
+
+class TestHashFile:
+    def test_sources(self, tmp_path):
+        rng = random.Random(b"test_seed")
+        data = randbytes(rng, 0x3000)
+        path = tmp_path / "file"
+        path.write_bytes(data)
+        for algorithm in ALGORITHMS:
+            expected = algorithm(data).digest()
+            assert hash_file(path, algorithm).digest() == expected
+            assert hash_file(str(path), algorithm).digest() == expected
+            with open(path, "rb") as f:
+                assert hash_file(f, algorithm).digest() == expected
+            assert hash_file(io.BytesIO(data), algorithm).digest() == expected
+
+    def test_position(self, tmp_path):
+        path = tmp_path / "file"
+        path.write_bytes(b"0123456789")
+        hasher = SHA256(b"prefix")
+        with open(path, "rb") as f:
+            f.read(4)
+            hasher.update_from_file(f)
+            assert f.read() == b""
+        assert hasher.digest() == SHA256(b"prefix456789").digest()
+
+    def test_empty(self, tmp_path):
+        path = tmp_path / "file"
+        path.write_bytes(b"")
+        assert hash_file(path, MD5).digest() == MD5().digest()
+
+    def test_pipe(self):
+        rng = random.Random(b"test_seed")
+        data = randbytes(rng, 0x12345)
+        read_fd, write_fd = os.pipe()
+        writer = threading.Thread(
+            target=lambda: os.write(write_fd, data) and os.close(write_fd)
+        )
+        writer.start()
+        with os.fdopen(read_fd, "rb") as f:
+            assert hash_file(f, SHA1).digest() == SHA1(data).digest()
+        writer.join()
+
+    def test_proc(self):
+        # Reports a size of 0 but has content
+        path = "/proc/self/status"
+        if not os.path.exists(path):
+            pytest.skip("No /proc")
+        hasher = hash_file(path, MD5)
+        assert hasher.digested > 0
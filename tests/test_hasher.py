@@ -0,0 +1,163 @@
+import array
+import random
+
+import pytest
+
+from hashsoup import *
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [
+    MD2,
+    MD4,
+    MD5,
+    SHA1,
+    SHA224,
+    SHA256,
+    SHA384,
+    SHA512,
+    RIPEMD128,
+    RIPEMD160,
+    SHA3_224,
+    SHA3_256,
+    SHA3_384,
+    SHA3_512,
+]
+
+
+class TestUpdate:
+    def test_split(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x300)
+        for algorithm in ALGORITHMS:
+            expected = algorithm(target).digest()
+            for step in (1, 7, algorithm.LEN_BLOCK - 1, algorithm.LEN_BLOCK + 1):
+                hasher = algorithm()
+                for i in range(0, len(target), step):
+                    hasher.update(target[i : i + step])
+                assert hasher.digest() == expected, f"Failed with {algorithm, step}"
+
+    def test_buffer_types(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x200)
+        for algorithm in ALGORITHMS:
+            expected = algorithm(target).digest()
+            assert algorithm(bytearray(target)).digest() == expected
+            assert algorithm(memoryview(target)).digest() == expected
+            assert algorithm(memoryview(target)[:]).digest() == expected
+            assert algorithm(array.array("I", target)).digest() == expected
+
+    def test_numpy(self):
+        np = pytest.importorskip("numpy")
+        target = np.arange(100, dtype=np.uint8)
+        for algorithm in ALGORITHMS:
+            assert algorithm(target).digest() == algorithm(target.tobytes()).digest()
+        assert (
+            HMAC(b"k", SHA256, target).digest()
+            == HMAC(b"k", SHA256, target.tobytes()).digest()
+        )
+
+    def test_tail_only(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(randbytes(rng, algorithm.LEN_BLOCK * 3 + 5))
+            assert len(hasher.buffer) == 5
+
+
+class TestCopy:
+    def test_copy(self):
+        rng = random.Random(b"test_seed")
+        prefix, suffix = randbytes(rng, 0x150), randbytes(rng, 0x90)
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(prefix)
+            copy = hasher.copy()
+            copy.update(suffix)
+            assert hasher.digest() == algorithm(prefix).digest()
+            assert copy.digest() == algorithm(prefix + suffix).digest()
+
+    def test_copy_constants(self):
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(b"abc")
+            expected = hasher.digest()
+            copy = hasher.copy()
+            tables = [
+                copy.__dict__[n]
+                for n in algorithm._constant_names()
+                if n in copy.__dict__
+            ]
+            assert tables, f"No tables in {algorithm}"
+            for table in tables:
+                if isinstance(table[0], list):
+                    table[0][0] ^= 1
+                else:
+                    table[0] ^= 1
+            copy.update(b"def")
+            hasher._digest = None
+            assert hasher.digest() == expected, f"Failed with {algorithm}"
+            assert hasher._default_constants()
+
+    def test_memoized(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(randbytes(rng, 0x50))
+            first = hasher.digest()
+            assert hasher.digest() is first
+            hasher.update(b"a")
+            assert hasher.digest() != first
+
+
+class TestCheckpoints:
+    def test_checkpoints(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x400)
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(target[:0x33])
+            checkpoints = list(hasher.update_with_checkpoints(target[0x33:], 0x100))
+            assert [offset for offset, _ in checkpoints] == [0x100, 0x200, 0x300, 0x400]
+            for offset, digest in checkpoints:
+                assert digest == algorithm(target[:offset]).digest()
+            assert hasher.digest() == algorithm(target).digest()
+
+    def test_digests_at(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x200)
+        for algorithm in ALGORITHMS:
+            hasher = algorithm()
+            offsets = [0x1FF, 0, 5, 5, 0x200]
+            for offset, digest in hasher.digests_at(target, offsets):
+                assert digest == algorithm(target[:offset]).digest()
+            assert hasher.digested == len(target)
+
+    def test_closed_early(self):
+        target = bytes(range(256)) * 4
+        hasher = SHA256()
+        checkpoints = hasher.update_with_checkpoints(target, 100)
+        assert next(checkpoints)[0] == 100
+        checkpoints.close()
+        assert hasher.digest() == SHA256(target).digest()
+
+    def test_not_consumed(self):
+        # Nothing is pending once the generator is closed or collected
+        target = bytes(range(256)) * 4
+        hasher = SHA256()
+        checkpoints = hasher.update_with_checkpoints(target, 100)
+        assert hasher.digested == 0
+        checkpoints.close()
+        assert hasher.digest() == SHA256(target).digest()
+
+        hasher = SHA256()
+        hasher.update_with_checkpoints(target, 100)
+        assert hasher.digest() == SHA256(target).digest()
+
+    def test_bad_offset(self):
+        hasher = SHA256()
+        with pytest.raises(AssertionError):
+            hasher.digests_at(b"abc", [1, 4])
+        with pytest.raises(AssertionError):
+            hasher.update_with_checkpoints(b"abc", 0)
+        assert hasher.digested == 0
@@ -0,0 +1,108 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from hashsoup import *
+from hashsoup import instrument, native
+from hashsoup.hasher import Hasher
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+class TestInstrument:
+    def test_counters(self):
+        instrument.reset()
+        instrument.enable()
+        try:
+            hasher = SHA256(b"a" * (SHA256.LEN_BLOCK * 3 + 5))
+            hasher.digest()
+            hasher.digest()
+            SHA3_256(b"abc").digest()
+            SHAKE_128(inp=b"abc").digest(1000)
+        finally:
+            instrument.disable()
+
+        stats = instrument.to_dict()
+        sha256 = stats["SHA256"]
+        assert sha256["counters"]["bytes_absorbed"] == SHA256.LEN_BLOCK * 3 + 5
+        assert sha256["counters"]["buffer_reallocations"] == 1
+        assert sha256["counters"]["copies"] == 1
+        assert sha256["counters"]["digests_memoized"] == 1
+        assert sha256["histograms"]["update"]["count"] == 1
+        assert sha256["histograms"]["compression"]["count"] == 4
+        assert sha256["histograms"]["digest"]["count"] == 1
+        assert stats["SHA3_256"]["histograms"]["compression"]["count"] == 1
+        assert stats["SHAKE_128"]["histograms"]["permutation"]["count"] == 5
+
+    def test_overrides(self):
+        instrument.reset()
+        instrument.enable()
+        try:
+            MD2(b"abc").copy()
+            SHA3_256(b"abc").copy()
+            SHAKE_128(inp=b"abc").digest(1000)
+            SHAKE_128(256, b"abc").digest()
+        finally:
+            instrument.disable()
+
+        stats = instrument.to_dict()
+        assert stats["MD2"]["counters"]["copies"] == 1
+        assert stats["SHA3_256"]["counters"]["copies"] == 1
+        assert stats["SHAKE_128"]["histograms"]["digest"]["count"] == 2
+
+    def test_native(self):
+        if not native.available(SHA256()):
+            pytest.skip("No libcrypto")
+        instrument.reset()
+        instrument.enable()
+        try:
+            hasher = SHA256()
+            hasher.backend = "auto"
+            hasher.update(b"a" * (SHA256.LEN_BLOCK * 3 + 5))
+        finally:
+            instrument.disable()
+        assert instrument.to_dict()["SHA256"]["histograms"]["compression"]["count"] == 3
+
+    def test_disabled(self):
+        instrument.reset()
+        instrument.enable()
+        instrument.disable()
+        assert "update" in Hasher.__dict__
+        assert Hasher.update.__module__ == "hashsoup.hasher"
+        SHA1(b"abc").digest()
+        assert instrument.to_dict() == {}
+
+    def test_dump(self, tmp_path):
+        instrument.reset()
+        instrument.enable()
+        try:
+            MD5(b"abc").digest()
+        finally:
+            instrument.disable()
+
+        instrument.dump(tmp_path / "stats.json")
+        stats = json.loads((tmp_path / "stats.json").read_text())
+        assert stats["MD5"]["histograms"]["compression"]["count"] == 1
+
+        instrument.dump(tmp_path / "stats.prom", format="prometheus")
+        text = (tmp_path / "stats.prom").read_text()
+        assert 'hashsoup_bytes_absorbed_total{algorithm="MD5"} 3' in text
+        assert 'hashsoup_compression_seconds_count{algorithm="MD5"} 1' in text
+        assert (
+            'hashsoup_compression_seconds_bucket{algorithm="MD5",le="+Inf"} 1' in text
+        )
+
+    def test_lazy_import(self):
+        code = (
+            "from hashsoup import instrument\n"
+            "instrument.enable()\n"
+            "from hashsoup import MD5\n"
+            "MD5(b'a' * 200).digest()\n"
+            "stats = instrument.to_dict()['MD5']\n"
+            "assert stats['histograms']['compression']['count'] == 4, stats\n"
+        )
+        env = dict(os.environ, PYTHONPATH=SRC, HASHSOUP_BACKEND="python")
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
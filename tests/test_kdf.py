@@ -0,0 +1,74 @@
+import hashlib
+
+import pytest
+
+from hashsoup import *
+from hashsoup import hasher as hasher_module
+
+ALGORITHMS = [
+    (MD5, "md5"),
+    (SHA1, "sha1"),
+    (SHA224, "sha224"),
+    (SHA256, "sha256"),
+    (SHA384, "sha384"),
+    (SHA512, "sha512"),
+    (SHA3_256, "sha3_256"),
+]
+
+
+def reference(algorithm, password, salt, iterations, dklen):
+    # PBKDF2 spelled out on top of HMAC
+    mac = HMAC(password, algorithm)
+    out = b""
+    i = 1
+    while len(out) < dklen:
+        u = t = mac.sign(salt + i.to_bytes(4, "big"))
+        for _ in range(iterations - 1):
+            u = mac.sign(u)
+            t = bytes(a ^ b for a, b in zip(t, u))
+        out += t
+        i += 1
+    return out[:dklen]
+
+
+@pytest.fixture
+def auto():
+    hasher_module.set_backend("auto")
+    yield
+    hasher_module.set_backend("python")
+
+
+class TestPBKDF2:
+    def test_hashlib(self):
+        for algorithm, name in ALGORITHMS:
+            for dklen in (None, 1, 100):
+                expected = hashlib.pbkdf2_hmac(name, b"password", b"salt", 20, dklen)
+                assert (
+                    pbkdf2_hmac(algorithm, b"password", b"salt", 20, dklen, workers=1)
+                    == expected
+                ), f"Failed with {algorithm, dklen}"
+
+    def test_parallel(self):
+        expected = hashlib.pbkdf2_hmac("sha1", b"password", b"salt", 10, 70)
+        assert pbkdf2_hmac(SHA1, b"password", b"salt", 10, 70, workers=2) == expected
+
+    def test_custom_constants(self):
+        base = SHA256()
+        base.k[0] ^= 1
+        expected = reference(base, b"password", b"salt", 5, 40)
+        assert pbkdf2_hmac(base, b"password", b"salt", 5, 40, workers=1) == expected
+        assert expected != hashlib.pbkdf2_hmac("sha256", b"password", b"salt", 5, 40)
+
+    def test_no_compressor(self):
+        expected = reference(MD2, b"password", b"salt", 5, 20)
+        assert pbkdf2_hmac(MD2, b"password", b"salt", 5, 20) == expected
+
+    def test_auto(self, auto):
+        expected = hashlib.pbkdf2_hmac("sha256", b"password", b"salt", 5)
+        assert pbkdf2_hmac(SHA256, b"password", b"salt", 5, workers=1) == expected
+
+        # Injected states are not handed to hashlib
+        base = SHA256(state=b"\x01" * 32)
+        expected = reference(base, b"password", b"salt", 5, 32)
+        assert pbkdf2_hmac(base, b"password", b"salt", 5, workers=1) == expected
+        assert expected != hashlib.pbkdf2_hmac("sha256", b"password", b"salt", 5)
@@ -1,4 +1,6 @@
 import hashlib
+import io
+import pickle
 import random
 
 from hashsoup import *
@@ -203,3 +205,64 @@ class TestSHAKE_256:
             assert SHAKE_256(512, target).digest() == hashlib.shake_256(target).digest(
                 512 // 8
             )
+
+
+class TestSHAKEReader:
+    def test_digest_length(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x123)
+        for algorithm, ref in [
+            (SHAKE_128, hashlib.shake_128),
+            (SHAKE_256, hashlib.shake_256),
+        ]:
+            hasher = algorithm(inp=target)
+            for length in (0, 1, 32, algorithm.LEN_BLOCK, 1000):
+                assert hasher.digest(length) == ref(target).digest(length)
+            assert hasher.hexdigest(100) == ref(target).hexdigest(100)
+
+    def test_read(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x80)
+        for algorithm, ref in [
+            (SHAKE_128, hashlib.shake_128),
+            (SHAKE_256, hashlib.shake_256),
+        ]:
+            expected = ref(target).digest(2000)
+            reader = algorithm(inp=target).reader()
+            out = b""
+            for n in (1, 7, algorithm.LEN_BLOCK, 300, 0, 1):
+                out += reader.read(n)
+            buf = bytearray(2000 - len(out))
+            assert reader.readinto(buf) == len(buf)
+            assert out + buf == expected
+
+    def test_write_to(self):
+        target = b"keystream"
+        reader = SHAKE_128(inp=target).reader()
+        f = io.BytesIO()
+        assert reader.write_to(f, 5000, chunk_size=1000) == 5000
+        assert f.getvalue() == hashlib.shake_128(target).digest(5000)
+
+    def test_reader_keeps_hasher(self):
+        hasher = SHAKE_256(inp=b"abc")
+        hasher.reader().read(500)
+        hasher.update(b"def")
+        assert hasher.digest(64) == hashlib.shake_256(b"abcdef").digest(64)
+
+
+class TestRounds:
+    def test_reduced(self):
+        data = bytes(range(256)) * 2
+        hasher, expected = SHA3_256(), SHA3_256()
+        hasher.nr = expected.nr = 12
+        hasher.update(data)
+        for i in range(
+            0, len(data) - len(data) % expected.LEN_BLOCK, expected.LEN_BLOCK
+        ):
+            expected._update_chunk(data[i : i + expected.LEN_BLOCK])
+        assert hasher.state == expected.state
+        assert not hasher._default_constants()
+        assert pickle.loads(pickle.dumps(hasher)).nr == 12
+
+        # The reduced function is not reused for the standard one
+        assert SHA3_256(data).digest() == hashlib.sha3_256(data).digest()
@@ -0,0 +1,85 @@
+import hashlib
+import hmac
+import random
+
+from hashsoup import *
+from hashsoup import mac as mac_module
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [
+    (MD5, "md5"),
+    (SHA1, "sha1"),
+    (SHA256, "sha256"),
+    (SHA512, "sha512"),
+    (SHA3_256, "sha3_256"),
+]
+
+
+class TestHMAC:
+    def test_hmac(self):
+        rng = random.Random(b"test_seed")
+        for algorithm, name in ALGORITHMS:
+            for len_key in (0, 16, algorithm.LEN_BLOCK, algorithm.LEN_BLOCK + 1):
+                key, msg = randbytes(rng, len_key), randbytes(rng, 0x123)
+                expected = hmac.new(key, msg, name).digest()
+                assert HMAC(key, algorithm, msg).digest() == expected
+                assert HMAC(key, algorithm).sign(msg) == expected
+
+                mac = HMAC(key, algorithm)
+                mac.update(msg[:10])
+                copy = mac.copy()
+                mac.update(msg[10:])
+                assert mac.digest() == expected
+                copy.update(b"other")
+                assert (
+                    copy.digest() == hmac.new(key, msg[:10] + b"other", name).digest()
+                )
+
+    def test_many(self):
+        rng = random.Random(b"test_seed")
+        key = randbytes(rng, 32)
+        messages = [randbytes(rng, len_) for len_ in range(0, 300, 37)]
+        mac = HMAC(key, SHA256)
+        macs = mac.sign_many(messages)
+        assert macs == [hmac.new(key, m, "sha256").digest() for m in messages]
+
+        macs[3] = bytes(32)
+        expected = [i != 3 for i in range(len(messages))]
+        assert mac.verify_many(messages, macs) == expected
+
+    def test_custom_constants(self):
+        base = MD5()
+        base.K[0] ^= 1
+        key, msg = b"key", b"message"
+
+        inner = base.copy()
+        inner.update(bytes(k ^ 0x36 for k in key.ljust(64, b"\x00")) + msg)
+        outer = base.copy()
+        outer.update(bytes(k ^ 0x5C for k in key.ljust(64, b"\x00")) + inner.digest())
+
+        mac = HMAC(key, base).sign(msg)
+        assert mac == outer.digest()
+        assert mac != hmac.new(key, msg, "md5").digest()
+
+    def test_cache(self, monkeypatch):
+        monkeypatch.setattr(mac_module, "MAX_CACHED_KEYS", 2)
+        mac_module._midstates.clear()
+        first = HMAC(b"a", SHA1)
+        assert HMAC(b"a", SHA1)._inner_start is first._inner_start
+        HMAC(b"b", SHA1)
+        HMAC(b"c", SHA1)
+        assert len(mac_module._midstates) == 2
+        assert HMAC(b"a", SHA1)._inner_start is not first._inner_start
+
+    def test_injected_state_not_cached(self):
+        mac_module._midstates.clear()
+        HMAC(b"k", SHA256(state=bytes(32)))
+        assert not mac_module._midstates
+        expected = hmac.new(b"k", b"message", "sha256").digest()
+        assert HMAC(b"k", SHA256).sign(b"message") == expected
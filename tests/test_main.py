@@ -0,0 +1,75 @@
+import hashlib
+
+from hashsoup import *
+from hashsoup.__main__ import main
+
+
+class TestMain:
+    def test_print(self, tmp_path, capsys):
+        a, b = tmp_path / "a", tmp_path / "b"
+        a.write_bytes(b"hello")
+        b.write_bytes(b"world" * 1000)
+        for jobs in ("1", "2"):
+            assert main(["-a", "md5", "-j", jobs, str(a), str(b)]) == 0
+            out = capsys.readouterr().out.splitlines()
+            assert out == [
+                f"{hashlib.md5(b'hello').hexdigest()}  {a}",
+                f"{hashlib.md5(b'world' * 1000).hexdigest()}  {b}",
+            ]
+
+    def test_shake(self, tmp_path, capsys):
+        a = tmp_path / "a"
+        a.write_bytes(b"hello")
+        assert main(["-a", "shake_256", "-l", "100", str(a)]) == 0
+        expected = hashlib.shake_256(b"hello").hexdigest(100)
+        assert capsys.readouterr().out == f"{expected}  {a}\n"
+
+    def test_check(self, tmp_path, capsys):
+        a, b = tmp_path / "a", tmp_path / "b"
+        a.write_bytes(b"hello")
+        b.write_bytes(b"world")
+        manifest = tmp_path / "manifest"
+        manifest.write_text(
+            f"{hashlib.sha256(b'hello').hexdigest()}  {a}\n"
+            f"{hashlib.sha256(b'world').hexdigest()} *{b}\n"
+            f"{hashlib.sha256(b'').hexdigest()}  {tmp_path / 'missing'}\n"
+        )
+        assert main(["-c", "-j", "2", str(manifest)]) == 1
+        captured = capsys.readouterr()
+        assert f"{a}: OK" in captured.out
+        assert f"{b}: OK" in captured.out
+        assert f"{tmp_path / 'missing'}: FAILED open or read" in captured.out
+        assert "MB/s" in captured.err
+
+        b.write_bytes(b"changed")
+        manifest.write_text(f"{hashlib.sha256(b'world').hexdigest()}  {b}\n")
+        assert main(["-c", "--status", str(manifest)]) == 1
+        assert capsys.readouterr().out == ""
+
+    def test_extension(self, capsys):
+        prefix = b"a" * SHA256.LEN_BLOCK
+        state = SHA256(prefix)._state_bytes().hex()
+        argv = ["--state", state, "--digested", str(len(prefix)), "--append", "bc"]
+        assert main(argv) == 0
+        assert capsys.readouterr().out == f"{SHA256(prefix + b'bc').hexdigest()}\n"
+
+    def test_check_malformed(self, tmp_path, capsys):
+        a = tmp_path / "a"
+        a.write_bytes(b"hello")
+        digest = hashlib.sha256(b"hello").hexdigest()
+        manifest = tmp_path / "manifest"
+        manifest.write_text(
+            f"not-hex  {a}\n{digest[:10]}  {a}\n{digest}  {a}\n{digest} *{a}\n"
+        )
+        assert main(["-c", str(manifest)]) == 0
+        captured = capsys.readouterr()
+        assert captured.out == f"{a}: OK\n{a}: OK\n"
+        assert "2 lines are improperly formatted" in captured.err
+        assert "2 files" in captured.err
+
+        a.write_bytes(b"changed")
+        assert main(["-c", "-j", "2", str(manifest)]) == 1
+        assert capsys.readouterr().out == f"{a}: FAILED\n{a}: FAILED\n"
+
+        manifest.write_text("garbage\n")
+        assert main(["-c", str(manifest)]) == 1
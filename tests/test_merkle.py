@@ -0,0 +1,62 @@
+import hashlib
+
+from hashsoup import *
+from hashsoup import merkle
+
+
+def reference_root(items, leaf_prefix=b"\x00", node_prefix=b"\x01"):
+    nodes = [hashlib.sha256(leaf_prefix + item).digest() for item in items]
+    while len(nodes) > 1:
+        parents = []
+        for i in range(0, len(nodes), 2):
+            if i + 1 < len(nodes):
+                pair = node_prefix + nodes[i] + nodes[i + 1]
+                parents.append(hashlib.sha256(pair).digest())
+            else:
+                parents.append(nodes[i])
+        nodes = parents
+    return nodes[0]
+
+
+ITEMS = [b"leaf %d" % i for i in range(37)]
+
+
+class TestMerkleTree:
+    def test_root(self):
+        for n in (1, 2, 3, 7, 8, 9, 37):
+            tree = MerkleTree(SHA256, ITEMS[:n])
+            assert len(tree) == n
+            assert tree.root() == reference_root(ITEMS[:n])
+
+    def test_append(self):
+        tree = MerkleTree()
+        for n, item in enumerate(ITEMS, 1):
+            tree.append(item)
+            assert tree.root() == reference_root(ITEMS[:n])
+        tree.extend([b"more", b"leaves"])
+        assert tree.root() == reference_root(ITEMS + [b"more", b"leaves"])
+
+    def test_update(self):
+        items = list(ITEMS)
+        tree = MerkleTree(SHA256, items)
+        for index in (0, 17, 36):
+            items[index] = b"changed %d" % index
+            tree[index] = items[index]
+            assert tree.root() == reference_root(items)
+
+    def test_prefixes(self):
+        tree = MerkleTree(SHA256, ITEMS, leaf_prefix=b"L", node_prefix=b"N")
+        assert tree.root() == reference_root(ITEMS, b"L", b"N")
+
+    def test_proofs(self):
+        tree = MerkleTree(SHA1, ITEMS)
+        proofs = [(item, tree.proof(i)) for i, item in enumerate(ITEMS)]
+        assert tree.verify_many(proofs) == [True] * len(ITEMS)
+        assert tree.verify(ITEMS[5], tree.proof(5), tree.root())
+        assert not tree.verify(ITEMS[5], tree.proof(6))
+        assert not tree.verify(b"forged", tree.proof(5))
+
+    def test_parallel(self, monkeypatch):
+        monkeypatch.setattr(merkle, "LEAVES_PER_TASK", 8)
+        tree = MerkleTree(SHA256, ITEMS, workers=2)
+        assert tree.root() == reference_root(ITEMS)
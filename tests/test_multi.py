@@ -0,0 +1,69 @@
+import random
+
+from hashsoup import *
+from hashsoup import multi, native
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [MD5, SHA1, SHA256, SHA3_256]
+
+
+class TestMultiHasher:
+    def test_digests(self):
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x345)
+        hasher = MultiHasher(ALGORITHMS)
+        for i in range(0, len(target), 100):
+            hasher.update(target[i : i + 100])
+        expected = {a.__name__: a(target).digest() for a in ALGORITHMS}
+        assert hasher.digests() == expected
+        assert MultiHasher(ALGORITHMS, target).hexdigests() == {
+            name: digest.hex() for name, digest in expected.items()
+        }
+
+    def test_copy(self):
+        hasher = MultiHasher([MD2, SHA512], b"prefix")
+        copy = hasher.copy()
+        copy.update(b"suffix")
+        assert hasher.digests()["MD2"] == MD2(b"prefix").digest()
+        assert copy.digests()["SHA512"] == SHA512(b"prefixsuffix").digest()
+
+    def test_instances(self):
+        base = SHA1()
+        base.K[0] ^= 1
+        hasher = MultiHasher([base, MD5], b"abc")
+        base.update(b"abc")
+        assert hasher.digests()["SHA1"] == base.digest()
+
+    def test_parallel(self, monkeypatch):
+        monkeypatch.setattr(multi, "PARALLEL_MIN", 0x100)
+        rng = random.Random(b"test_seed")
+        target = randbytes(rng, 0x300)
+        hasher = MultiHasher(ALGORITHMS, target[:5], workers=2)
+        hasher.update(target[5:])
+        hasher.update(b"tail")
+        expected = {a.__name__: a(target + b"tail").digest() for a in ALGORITHMS}
+        assert hasher.digests() == expected
+
+    def test_parallel_selection(self, monkeypatch):
+        # libcrypto-backed hashers stay in this process under auto
+        monkeypatch.setattr(multi, "PARALLEL_MIN", 0x100)
+        hashers = [SHA256(), MD5(), SHA3_256(), RIPEMD128()]
+        for hasher in hashers:
+            hasher.backend = "auto"
+        selected = [h for h in hashers if h._compresses_in_python()]
+        if native.available(SHA256()):
+            assert [type(h) for h in selected] == [SHA3_256, RIPEMD128]
+        else:
+            assert len(selected) == 4
+
+        hasher = MultiHasher(hashers, bytes(0x300), workers=2)
+        assert hasher.digests() == {
+            type(h).__name__: type(h)(bytes(0x300)).digest() for h in hashers
+        }
+        assert [h.backend for h in hasher.hashers] == ["auto"] * 4
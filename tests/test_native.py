@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from hashsoup import *
+from hashsoup import hasher as hasher_module
+from hashsoup import native
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [MD4, MD5, SHA1, SHA224, SHA256, SHA384, SHA512, RIPEMD160]
+
+
+@pytest.fixture
+def auto():
+    hasher_module.set_backend("auto")
+    yield
+    hasher_module.set_backend("python")
+
+
+def python(algorithm, data=b"", **kwargs):
+    hasher = algorithm(**kwargs)
+    hasher.backend = "python"
+    hasher.update(data)
+    return hasher
+
+
+class TestNative:
+    def test_injected_state(self, auto):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            if not native.available(algorithm()):
+                continue
+            state = randbytes(rng, algorithm.LEN_STATE)
+            data = randbytes(rng, algorithm.LEN_BLOCK * 5 + 3)
+            kwargs = {"state": state, "digested": algorithm.LEN_BLOCK}
+
+            hasher = algorithm(**kwargs)
+            reference = python(algorithm, **kwargs)
+            assert native.blocks_updater(hasher) is not None
+            for inp in (data[:7], bytearray(data[7:100]), memoryview(data)[100:]):
+                hasher.update(inp)
+                reference.update(inp)
+                assert hasher.state == reference.state, f"Failed with {algorithm}"
+            assert hasher.digest() == reference.digest()
+
+    def test_extend(self, auto):
+        for algorithm in ALGORITHMS:
+            known = algorithm(b"secret" + b"message").digest()
+            if algorithm.LEN_STATE != len(known):
+                continue
+            forged = extend(algorithm, known, b"message", b"suffix", [6])
+            ((message, digest),) = forged
+            assert digest == python(algorithm, b"secret" + message).digest()
+
+    def test_modified_constants(self, auto):
+        hasher = MD5(state=bytes(16), digested=64)
+        hasher.K[0] ^= 1
+        assert native.blocks_updater(hasher) is None
+
+    def test_missing_library(self, auto, monkeypatch):
+        monkeypatch.setattr(native, "_functions", {"MD5_Update": None})
+        hasher = MD5(state=bytes(16), digested=64)
+        assert not native.available(hasher)
+        hasher.update(b"a" * 200)
+        reference = python(MD5, state=bytes(16), digested=64)
+        reference.update(b"a" * 200)
+        assert hasher.digest() == reference.digest()
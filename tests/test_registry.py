@@ -0,0 +1,48 @@
+import hashlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+import hashsoup
+from hashsoup import *
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+class TestRegistry:
+    def test_new(self):
+        for name in hashsoup.algorithms_available:
+            hasher = hashsoup.new(name, b"hello")
+            assert type(hasher) is getattr(hashsoup, name.upper())
+            if name in hashlib.algorithms_available and not name.startswith("shake"):
+                assert hasher.digest() == hashlib.new(name, b"hello").digest()
+
+        assert hashsoup.new("SHA256").digest() == hashlib.sha256().digest()
+        with pytest.raises(AssertionError):
+            hashsoup.new("whirlpool")
+
+    def test_new_resume(self):
+        first = SHA256(b"A" * 64)
+        state = b"".join(x.to_bytes(4, "big") for x in first.state)
+        hasher = hashsoup.new("sha256", b"tail", state=state, digested=64)
+        assert hasher.digest() == hashlib.sha256(b"A" * 64 + b"tail").digest()
+
+    def test_lazy(self):
+        code = (
+            "import sys, hashsoup\n"
+            "assert 'hashsoup.sha256' not in sys.modules\n"
+            "assert 'hashsoup.files' not in sys.modules\n"
+            "hashsoup.MD5\n"
+            "assert 'hashsoup.md5' in sys.modules\n"
+            "assert 'hashsoup.sha256' not in sys.modules\n"
+        )
+        env = dict(os.environ, PYTHONPATH=SRC)
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+    def test_attributes(self):
+        assert hashsoup.files.hash_file is hashsoup.hash_file
+        assert "MerkleTree" in dir(hashsoup)
+        with pytest.raises(AttributeError):
+            hashsoup.nothing
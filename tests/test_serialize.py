@@ -0,0 +1,78 @@
+import pickle
+import random
+
+from hashsoup import *
+from hashsoup.hasher import Hasher
+
+try:
+    random.randbytes(1)
+    randbytes = lambda rng, len_: rng.randbytes(len_)
+except:
+    randbytes = lambda rng, len_: bytes(rng.getrandbits(8) for _ in range(len_))
+
+
+ALGORITHMS = [
+    MD2,
+    MD4,
+    MD5,
+    SHA1,
+    SHA224,
+    SHA256,
+    SHA384,
+    SHA512,
+    RIPEMD128,
+    RIPEMD160,
+    SHA3_224,
+    SHA3_256,
+    SHA3_384,
+    SHA3_512,
+    lambda inp=None: SHAKE_128(512, inp),
+    lambda inp=None: SHAKE_256(512, inp),
+]
+
+
+class TestSerialize:
+    def test_roundtrip(self):
+        rng = random.Random(b"test_seed")
+        prefix, suffix = randbytes(rng, 0x123), randbytes(rng, 0x45)
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(prefix)
+            restored = Hasher.from_bytes(hasher.to_bytes())
+            assert type(restored) is type(hasher)
+            assert restored.digest() == hasher.digest()
+            restored.update(suffix)
+            assert restored.digest() == algorithm(prefix + suffix).digest()
+
+    def test_pickle(self):
+        rng = random.Random(b"test_seed")
+        for algorithm in ALGORITHMS:
+            hasher = algorithm(randbytes(rng, 0x123))
+            restored = pickle.loads(pickle.dumps(hasher))
+            assert restored.digest() == hasher.digest()
+            assert len(pickle.dumps(hasher)) < len(hasher.to_bytes()) + 100
+
+    def test_pickle_modified_constants(self):
+        hasher = SHA256()
+        hasher.k[0] ^= 1
+        hasher.update(b"a" * 100)
+        restored = pickle.loads(pickle.dumps(hasher))
+        assert restored.k == hasher.k
+        assert restored.digest() == hasher.digest()
+
+    def test_wrong_class(self):
+        record = MD5(b"abc").to_bytes()
+        assert MD5.from_bytes(record).digest() == MD5(b"abc").digest()
+        try:
+            SHA1.from_bytes(record)
+        except AssertionError:
+            pass
+        else:
+            assert False, "SHA1 accepted an MD5 record"
+
+    def test_keccak_state(self):
+        rng = random.Random(b"test_seed")
+        prefix, suffix = randbytes(rng, SHA3_256.LEN_BLOCK), randbytes(rng, 0x45)
+        hasher = SHA3_256(prefix)
+        other = SHA3_256(state=hasher._state_bytes(), digested=len(prefix))
+        other.update(suffix)
+        assert other.digest() == SHA3_256(prefix + suffix).digest()